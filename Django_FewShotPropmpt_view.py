@@ -1,40 +1,21 @@
-import json
-import re  # <--- NEW: Import Regex
-import docx
-import boto3
+from asgiref.sync import sync_to_async
 from django.http import StreamingHttpResponse
-from django.shortcuts import render
+from django.shortcuts import redirect, render
+from django.urls import reverse
 from .forms import LLMSubmissionForm
-from langchain_aws import ChatBedrock
-from langchain_core.messages import HumanMessage
-
-# --- Helper: Extract Text ---
-def extract_text(uploaded_file):
-    filename = uploaded_file.name.lower()
-    if filename.endswith('.docx'):
-        doc = docx.Document(uploaded_file)
-        full_text = [para.text for para in doc.paragraphs]
-        return '\n'.join(full_text)
-    else:
-        return uploaded_file.read().decode('utf-8')
-
-# --- The Generator Function ---
-def stream_strategy_generator(sample_drs, sample_strat, target_drs):
-    # 1. Setup Bedrock (SSL Verify False for Corporate Proxy)
-    bedrock_client = boto3.client(
-        service_name="bedrock-runtime",
-        region_name="us-east-1",
-        verify=False 
-    )
-
-    chat = ChatBedrock(
-        client=bedrock_client,
-        model_id="anthropic.claude-3-sonnet-20240229-v1:0",
-        model_kwargs={"temperature": 0.1, "max_tokens": 4096}
-    )
+from .artifact_store import StrategyArtifacts
+from .bedrock_client import get_generation_chats
+from .drs_index import RequirementContext
+from .job_queue import get_job_runner
+from .outline_parser import OutlineError, OutlineParser
+from .outline_store import FLAT, astream_outline, get_outline_store, stream_outline
+from .metrics import instrumented
+from .prompt_context import TokenReport, build_shared_context, prompt_caching_enabled, section_task
+from .section_runner import SECTION_CONCURRENCY, AsyncSectionPipeline, SectionPipeline
+from .text_extraction import ExtractionLimitError, extract_text
 
-    # --- HTML Header ---
-    yield """
+# --- Static page parts (shared by the sync and async generators) ---
+PAGE_HEADER = """
     <html>
     <head>
         <style>
@@ -51,111 +32,297 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
     </head>
     <body>
         <h2>Generating Test Strategy...</h2>
-        <button id="download-btn" onclick="downloadFile()">Download Full Strategy (.md)</button>
+        <a id="download-btn">Download Full Strategy (.md)</a>
         <div id="stream-container">
     """
+
+PAGE_FOOTER = """
+        </div>
+        <script>
+            window.scrollTo(0, document.body.scrollHeight);
+        </script>
+    </body>
+    </html>
+    """
+
+
+# --- The Generator Function ---
+@instrumented("few_shot")
+def stream_strategy_generator(sample_drs, sample_strat, target_drs, max_workers=SECTION_CONCURRENCY, stream_tokens=True, use_cache=True, metrics=None):
+    # 1. Setup Bedrock (pooled client + chat, shared across requests and threads)
+    with metrics.span("client_setup"):
+        chat, outline_chat = get_generation_chats(metrics, use_cache)
+
+    # --- HTML Header ---
+    yield PAGE_HEADER
+
+    # STYLE REFERENCE (+ INPUT REQUIREMENT for small DRS) is built once and sent as a
+    # shared prefix, cacheable where the model supports prompt caching; a large
+    # DRS is indexed and each section gets its own excerpts
+    with metrics.span("drs_index"):
+        requirements = RequirementContext(target_drs)
+    caching = prompt_caching_enabled(chat.model_id)
+    shared_context = build_shared_context(sample_strat, requirements.shared_text, caching)
+    token_report = TokenReport(shared_context, caching)
+
+    def write_section(section):
+        # Only the task (and its excerpts) changes per section; the shared context is the cached prefix
+        messages = [shared_context, section_task(section, requirements.for_section(section, metrics))]
+        token_report.wait_for_prefix()
+        if stream_tokens:
+            return token_report.track_stream(chat.stream(messages), section)
+        try:
+            response = chat.invoke(messages)
+        finally:
+            token_report.set_prefix_ready()
+        token_report.count_call(response)
+        token_report.add_usage(response, section)
+        return [response.content]
+
+    # Sections run in parallel and are streamed back in outline order
+    pipeline = SectionPipeline(write_section, max_workers)
     
     # 2. Step A: Generate the Outline
     yield '<div class="status-update">Phase 1: Analyzing samples and creating Outline...</div>'
     
-    outline_prompt = (
-        f"Analyze this Sample Strategy:\n{sample_strat}\n\n"
-        "Extract the high-level Section Headers used in this document. "
-        "Return ONLY a JSON list of strings. "
-        "Do not write any introductory text. "
-        "Example: [\"1. Scope\", \"2. Risk Analysis\", \"3. Test Approach\"]"
-    )
-    
-    # --- UPDATED PARSING LOGIC ---
+    # --- Outline: reuse the stored one for a known sample strategy, else ask the model ---
+    outline_store = get_outline_store()
     try:
-        response = chat.invoke([HumanMessage(content=outline_prompt)])
-        raw_content = response.content.strip()
-
-        # Regex: Find the first '[' and the last ']' and everything in between
-        match = re.search(r'\[.*\]', raw_content, re.DOTALL)
-        
-        if match:
-            json_str = match.group(0)
-            sections = json.loads(json_str)
+        with metrics.span("outline"):
+            sections = outline_store.get(sample_strat, FLAT)
+            outline_reused = sections is not None
+            if outline_reused:
+                for section in sections:
+                    pipeline.add(section)
+            else:
+                outline = OutlineParser(FLAT)
+                # Each section starts generating as soon as the streamed outline completes it
+                for section in stream_outline(outline_chat, sample_strat, outline, metrics):
+                    pipeline.add(section)
+                sections = outline.sections
+                # A truncated reply still yields its finished sections, but is not kept
+                if outline.complete:
+                    outline_store.put(sample_strat, FLAT, sections)
+        if not outline_reused:
+            yield f'<div class="status-success">Outline Created: {len(sections)} sections identified.</div>'
         else:
-            # If regex fails, try loading the raw content directly
-            sections = json.loads(raw_content)
-        
-        yield f'<div class="status-success">Outline Created: {len(sections)} sections identified.</div>'
+            metrics.incr("outline_reused")
+            yield f'<div class="status-success">Outline reused for this Sample Strategy: {len(sections)} sections.</div>'
+
         yield '<ul class="outline-list">'
         for sec in sections:
             yield f'<li>{sec}</li>'
         yield '</ul><hr>'
 
-    except json.JSONDecodeError:
+    except OutlineError as e:
+        pipeline.close()
         # If it still fails, show the user EXACTLY what the AI returned so we can debug
-        yield f'<div class="error-box"><strong>Error Parsing JSON.</strong><br>The AI returned:<br><pre>{raw_content}</pre></div>'
+        yield f'<div class="error-box"><strong>Error Parsing JSON.</strong><br>The AI returned:<br><pre>{e.raw_content}</pre></div>'
         return
     except Exception as e:
+        pipeline.close()
         yield f'<div class="error-box">Error communicating with AI: {str(e)}</div>'
         return
+    except GeneratorExit:
+        # Client gone before reading any section: stop the ones already started
+        pipeline.close()
+        raise
 
-    # 3. Step B: Loop through Sections (Unchanged)
-    full_document = []
-    
-    for section in sections:
+    # 3. Step B: Generate Sections (started during the outline, streamed back in outline order)
+    # The .md download is written on the server as each section completes
+    artifacts = StrategyArtifacts(("md",))
+
+    for section, stream in pipeline:
         yield f'<div class="status-update">Generating Section: <strong>{section}</strong>...</div>'
-        
-        section_prompt = (
-            f"You are writing a Test Strategy. \n"
-            f"STYLE REFERENCE: {sample_strat}\n"
-            f"INPUT REQUIREMENT: {target_drs}\n\n"
-            f"TASK: Write ONLY the content for the section: '{section}'. "
-            "Do not include the section header itself in the output, just the body text. "
-            "Maintain the exact tone and formatting of the Style Reference."
-        )
-        
-        chunk_resp = chat.invoke([HumanMessage(content=section_prompt)])
-        content = chunk_resp.content
-        
-        full_document.append(f"## {section}\n{content}")
-        yield f'<div class="section-block"><h3>{section}</h3><div class="content">{content}</div></div>'
-
-    # 4. Final Hidden Block
-    final_md = "\n\n".join(full_document)
-    # Escape backslashes for JS safety
-    safe_md = final_md.replace('`', '\`').replace('\\', '\\\\')
-    
-    yield f'<div id="final-raw-content" style="display:none;">{final_md}</div>'
-    yield '<script>document.getElementById("download-btn").style.display = "inline-block";</script>'
+
+        # Tokens are written straight into the open section-block as they arrive
+        yield f'<div class="section-block"><h3>{section}</h3><div class="content">'
+        for text in stream:
+            yield text
+        yield '</div></div>'
+
+        artifacts.add_section(section, stream.text)
+        input_tokens, output_tokens = token_report.by_section.get(section, (None, None))
+        metrics.record("section", stream.last_token_latency or 0.0, section,
+                       first_token=stream.first_token_latency,
+                       input_tokens=input_tokens, output_tokens=output_tokens)
+
+    # 4. Download Link (served from the artifact store, not re-sent in the page)
+    with metrics.span("assembly"):
+        tokens = artifacts.finish()
+    metrics.incr("input_tokens", token_report.input_tokens)
+    metrics.incr("output_tokens", token_report.output_tokens)
+    md_url = reverse('download_artifact', args=[tokens['md']])
+
+    yield (
+        '<script>var btn = document.getElementById("download-btn");'
+        f'btn.href = "{md_url}"; btn.style.display = "inline-block";</script>'
+    )
+    yield f'<div class="status-update">{token_report.summary()}</div>'
     yield '<div class="status-success">Generation Complete!</div>'
     
-    yield """
-        </div>
-        <script>
-            function downloadFile() {
-                const content = document.getElementById('final-raw-content').innerText;
-                const blob = new Blob([content], { type: 'text/markdown' });
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = 'generated_strategy.md';
-                document.body.appendChild(a);
-                a.click();
-            }
-            window.scrollTo(0, document.body.scrollHeight);
-        </script>
-    </body>
-    </html>
+    yield PAGE_FOOTER
+
+
+# --- Async Generator (ASGI) ---
+@instrumented("few_shot_async")
+async def astream_strategy_generator(sample_drs, sample_strat, target_drs, max_workers=SECTION_CONCURRENCY, stream_tokens=True, use_cache=True, metrics=None):
     """
+    Same page as stream_strategy_generator, built on chat.ainvoke / chat.astream.
+    Sections run as tasks on the event loop, so an active stream holds no thread.
+    """
+    with metrics.span("client_setup"):
+        chat, outline_chat = get_generation_chats(metrics, use_cache)
+
+    yield PAGE_HEADER
 
-# --- View (Unchanged) ---
+    with metrics.span("drs_index"):
+        # Indexing a large DRS is CPU work; keep it off the event loop
+        requirements = await sync_to_async(RequirementContext, thread_sensitive=False)(target_drs)
+    caching = prompt_caching_enabled(chat.model_id)
+    shared_context = build_shared_context(sample_strat, requirements.shared_text, caching)
+    token_report = TokenReport(shared_context, caching)
+
+    async def write_section(section):
+        messages = [shared_context, section_task(section, requirements.for_section(section, metrics))]
+        await token_report.await_prefix()
+        if stream_tokens:
+            async for text in token_report.atrack_stream(chat.astream(messages), section):
+                yield text
+            return
+        try:
+            response = await chat.ainvoke(messages)
+        finally:
+            token_report.set_prefix_ready()
+        token_report.count_call(response)
+        token_report.add_usage(response, section)
+        yield response.content
+
+    pipeline = AsyncSectionPipeline(write_section, max_workers)
+    yield '<div class="status-update">Phase 1: Analyzing samples and creating Outline...</div>'
+
+    outline_store = get_outline_store()
+    try:
+        with metrics.span("outline"):
+            sections = outline_store.get(sample_strat, FLAT)
+            outline_reused = sections is not None
+            if outline_reused:
+                for section in sections:
+                    pipeline.add(section)
+            else:
+                outline = OutlineParser(FLAT)
+                # Each section starts generating as soon as the streamed outline completes it
+                async for section in astream_outline(outline_chat, sample_strat, outline, metrics):
+                    pipeline.add(section)
+                sections = outline.sections
+                # A truncated reply still yields its finished sections, but is not kept
+                if outline.complete:
+                    outline_store.put(sample_strat, FLAT, sections)
+        if not outline_reused:
+            yield f'<div class="status-success">Outline Created: {len(sections)} sections identified.</div>'
+        else:
+            metrics.incr("outline_reused")
+            yield f'<div class="status-success">Outline reused for this Sample Strategy: {len(sections)} sections.</div>'
+
+        yield '<ul class="outline-list">'
+        for sec in sections:
+            yield f'<li>{sec}</li>'
+        yield '</ul><hr>'
+
+    except OutlineError as e:
+        pipeline.close()
+        yield f'<div class="error-box"><strong>Error Parsing JSON.</strong><br>The AI returned:<br><pre>{e.raw_content}</pre></div>'
+        return
+    except Exception as e:
+        pipeline.close()
+        yield f'<div class="error-box">Error communicating with AI: {str(e)}</div>'
+        return
+    except GeneratorExit:
+        pipeline.close()
+        raise
+
+    artifacts = StrategyArtifacts(("md",))
+
+    async for section, stream in pipeline:
+        yield f'<div class="status-update">Generating Section: <strong>{section}</strong>...</div>'
+
+        yield f'<div class="section-block"><h3>{section}</h3><div class="content">'
+        async for text in stream:
+            yield text
+        yield '</div></div>'
+
+        artifacts.add_section(section, stream.text)
+        input_tokens, output_tokens = token_report.by_section.get(section, (None, None))
+        metrics.record("section", stream.last_token_latency or 0.0, section,
+                       first_token=stream.first_token_latency,
+                       input_tokens=input_tokens, output_tokens=output_tokens)
+
+    with metrics.span("assembly"):
+        tokens = artifacts.finish()
+    metrics.incr("input_tokens", token_report.input_tokens)
+    metrics.incr("output_tokens", token_report.output_tokens)
+    md_url = reverse('download_artifact', args=[tokens['md']])
+
+    yield (
+        '<script>var btn = document.getElementById("download-btn");'
+        f'btn.href = "{md_url}"; btn.style.display = "inline-block";</script>'
+    )
+    yield f'<div class="status-update">{token_report.summary()}</div>'
+    yield '<div class="status-success">Generation Complete!</div>'
+
+    yield PAGE_FOOTER
+
+
+def _extract_uploads(files):
+    return (
+        extract_text(files['sample_drs']),
+        extract_text(files['sample_strategy']),
+        extract_text(files['target_drs']),
+    )
+
+
+# --- View ---
 def llm_analysis(request):
+    """
+    Queues the generation as a background job and redirects to its page,
+    which polls for progress; the request thread is free immediately and
+    the job keeps running if the browser goes away.
+    """
     if request.method == 'POST':
         form = LLMSubmissionForm(request.POST, request.FILES)
         if form.is_valid():
-            s_drs = extract_text(request.FILES['sample_drs'])
-            s_strat = extract_text(request.FILES['sample_strategy'])
-            t_drs = extract_text(request.FILES['target_drs'])
+            try:
+                s_drs, s_strat, t_drs = _extract_uploads(request.FILES)
+            except ExtractionLimitError as e:
+                form.add_error(None, str(e))
+            else:
+                job_id = get_job_runner().submit(stream_strategy_generator, s_drs, s_strat, t_drs)
+                return redirect('job_page', job_id=job_id)
+    else:
+        form = LLMSubmissionForm()
+
+    return render(request, 'docx_reader/llm_analysis.html', {'form': form})
+
 
-            return StreamingHttpResponse(
-                stream_strategy_generator(s_drs, s_strat, t_drs)
-            )
+# --- Async View (ASGI) ---
+async def llm_analysis_async(request):
+    """
+    ASGI variant of llm_analysis that streams the page directly: the response
+    iterates astream_strategy_generator on the event loop, so hundreds of
+    concurrent generations share one thread.
+    """
+    if request.method == 'POST':
+        form = LLMSubmissionForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                # Parsing uploads is CPU work; keep it off the event loop
+                s_drs, s_strat, t_drs = await sync_to_async(_extract_uploads, thread_sensitive=False)(request.FILES)
+            except ExtractionLimitError as e:
+                form.add_error(None, str(e))
+            else:
+                return StreamingHttpResponse(
+                    astream_strategy_generator(s_drs, s_strat, t_drs)
+                )
     else:
         form = LLMSubmissionForm()
 
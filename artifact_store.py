@@ -0,0 +1,218 @@
+import json
+import os
+import re
+import secrets
+import tempfile
+import time
+
+from django.http import FileResponse, Http404
+from django.urls import path
+
+from .docx_assembly import DocxAssembler
+from .md_token_converter import TokenMarkdownToDocx
+
+# Finished documents are written here and served by token.
+ARTIFACT_DIR = os.environ.get(
+    "ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "strategy_artifacts")
+)
+ARTIFACT_TTL = 60 * 60  # seconds a download link stays valid
+PURGE_INTERVAL = 60     # expired artifacts are swept at most this often (seconds)
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MD_MIME = "text/markdown"
+JSON_MIME = "application/json"
+
+_TOKEN_RE = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+_last_purge = 0.0
+
+
+# --- 1. Storage ---
+def _paths(token):
+    return (
+        os.path.join(ARTIFACT_DIR, f"{token}.bin"),
+        os.path.join(ARTIFACT_DIR, f"{token}.json"),
+    )
+
+
+def new_token():
+    return secrets.token_urlsafe(18)
+
+
+def artifact_path(token):
+    """Where the artifact's bytes live; callers may write to it directly (e.g. doc.save(path))."""
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    return _paths(token)[0]
+
+
+def finish_artifact(token, filename, content_type):
+    """Records metadata once the file at artifact_path(token) is complete."""
+    meta = {"filename": filename, "content_type": content_type, "expires": time.time() + ARTIFACT_TTL}
+    meta_path = _paths(token)[1]
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)  # the artifact becomes visible atomically
+    return token
+
+
+def save_document(document, filename, content_type=DOCX_MIME):
+    """Saves a python-docx Document straight to disk and returns its download token."""
+    token = new_token()
+    document.save(artifact_path(token))
+    return finish_artifact(token, filename, content_type)
+
+
+def open_artifact(token):
+    """Returns (file object, filename, content_type), or None if unknown/expired."""
+    if not _TOKEN_RE.match(token or ""):
+        return None
+    data_path, meta_path = _paths(token)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta["expires"] < time.time():
+        _delete(token)
+        return None
+    return open(data_path, "rb"), meta["filename"], meta["content_type"]
+
+
+def _delete(token):
+    for p in _paths(token):
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+
+def purge_expired(force=False):
+    """
+    Removes expired artifacts, at most once per PURGE_INTERVAL unless forced,
+    so it can be called on every new artifact. Also drops half-written files
+    (no metadata) older than ARTIFACT_TTL, left behind when a client
+    disconnected mid-generation.
+    """
+    global _last_purge
+    now = time.time()
+    if not force and now - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = now
+    if not os.path.isdir(ARTIFACT_DIR):
+        return
+    for name in os.listdir(ARTIFACT_DIR):
+        path_ = os.path.join(ARTIFACT_DIR, name)
+        if name.endswith(".bin"):
+            token = name[:-len(".bin")]
+            try:
+                orphaned = (not os.path.exists(_paths(token)[1])
+                            and os.path.getmtime(path_) + ARTIFACT_TTL < now)
+            except OSError:
+                orphaned = False
+            if orphaned:
+                _delete(token)
+            continue
+        if not name.endswith(".json"):
+            continue
+        token = name[:-len(".json")]
+        try:
+            with open(path_) as f:
+                expired = json.load(f)["expires"] < now
+        except (OSError, ValueError, KeyError):
+            expired = True
+        if expired:
+            _delete(token)
+
+
+# --- 2. Incremental Strategy Artifacts ---
+class StrategyArtifacts:
+    """
+    Builds the .md / .json / .docx downloads on the server as each section
+    completes, instead of repeating the whole document in hidden divs at the
+    end of the stream. finish() returns {kind: token} for download_artifact.
+
+    The .md and .json files are appended to on disk; they come out the same
+    as "\n\n".join(full_document) and json.dumps(json_data, indent=4). The
+    .docx is converted section by section on a background thread
+    (DocxAssembler), so finish() only waits for the last section.
+    """
+
+    def __init__(self, kinds=("md", "json"), basename="generated_strategy", docx_title=None):
+        purge_expired()
+        self.basename = basename
+        self.tokens = {kind: new_token() for kind in kinds}
+        self._files = {
+            kind: open(artifact_path(token), "w", encoding="utf-8")
+            for kind, token in self.tokens.items() if kind in ("md", "json")
+        }
+        self._converter = self._docx = None
+        if "docx" in kinds:
+            self._converter = TokenMarkdownToDocx()
+            if docx_title:
+                self._converter._add_paragraph(docx_title, "Title")
+            self._docx = DocxAssembler(self._write_docx_section, self._converter.document)
+        self.count = 0
+
+    def add_section(self, title, content, level=None):
+        """Appends one finished section. level=None writes a flat '## title' section."""
+        md_level = level or 2
+        md = self._files.get("md")
+        if md is not None:
+            if self.count:
+                md.write("\n\n")
+            md.write(f"{'#' * md_level} {title}\n{content}")
+
+        out = self._files.get("json")
+        if out is not None:
+            entry = {"title": title, "content": content} if level is None else {
+                "title": title, "level": level, "content": content
+            }
+            body = json.dumps(entry, indent=4).replace("\n", "\n    ")
+            out.write(("[\n    " if not self.count else ",\n    ") + body)
+
+        if self._docx is not None:
+            self._docx.add(title, content, md_level)
+
+        for f in self._files.values():
+            f.flush()
+        self.count += 1
+
+    def _write_docx_section(self, document, title, content, md_level):
+        # Runs on the assembly thread
+        self._converter._add_paragraph(title, f"Heading {min(md_level, 9)}")
+        self._converter.convert(content)
+
+    def finish(self):
+        """Closes every artifact and makes it downloadable."""
+        out = self._files.get("json")
+        if out is not None:
+            out.write("\n]" if self.count else "[]")
+        for f in self._files.values():
+            f.close()
+        if self._docx is not None:
+            self._docx.save(artifact_path(self.tokens["docx"]))
+
+        names = {
+            "md": (f"{self.basename}.md", MD_MIME),
+            "json": (f"{self.basename}.json", JSON_MIME),
+            "docx": (f"{self.basename}.docx", DOCX_MIME),
+        }
+        for kind, token in self.tokens.items():
+            finish_artifact(token, *names[kind])
+        return dict(self.tokens)
+
+
+# --- 3. Download View ---
+def download_artifact(request, token):
+    """Streams a stored artifact back in chunks (FileResponse) instead of a data: URI."""
+    found = open_artifact(token)
+    if found is None:
+        raise Http404("This download link has expired.")
+    fileobj, filename, content_type = found
+    return FileResponse(fileobj, as_attachment=True, filename=filename, content_type=content_type)
+
+
+# --- 4. URL Configuration (If pasting into urls.py) ---
+urlpatterns = [
+    path('download/<str:token>/', download_artifact, name='download_artifact'),
+]
@@ -0,0 +1,215 @@
+import concurrent.futures
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+
+from .md_token_converter import TokenMarkdownToDocx
+
+# Worker processes used for batch Markdown -> DOCX conversion.
+BATCH_WORKERS = os.cpu_count() or 1
+MAX_BATCH_FILES = 1000              # inputs accepted per batch (after unpacking zips)
+MAX_INPUT_BYTES = 20 * 1024 * 1024  # per markdown file
+MARKDOWN_EXTENSIONS = ('.md', '.markdown', '.txt')
+
+
+class BatchError(ValueError):
+    """The batch itself is unusable (too many files, bad zip, ...)."""
+
+
+# --- 1. Inputs ---
+def _is_markdown(name):
+    base = os.path.basename(name)
+    return name.lower().endswith(MARKDOWN_EXTENSIONS) and not base.startswith('.') and '__MACOSX' not in name
+
+
+def iter_markdown_inputs(files):
+    """
+    Yields (name, bytes) for every markdown input. files is an iterable of
+    file objects with .name (uploads or open files); .zip files are unpacked
+    and their markdown members used, keeping their folder paths.
+    """
+    count = 0
+    for f in files:
+        name = os.path.basename(f.name)
+        if name.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(f)
+            except zipfile.BadZipFile:
+                raise BatchError(f"{name} is not a valid zip file.")
+            with archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not _is_markdown(info.filename):
+                        continue
+                    if info.file_size > MAX_INPUT_BYTES:
+                        raise BatchError(f"{info.filename} in {name} is larger than {MAX_INPUT_BYTES} bytes.")
+                    count += 1
+                    if count > MAX_BATCH_FILES:
+                        raise BatchError(f"A batch may contain at most {MAX_BATCH_FILES} markdown files.")
+                    yield _safe_name(info.filename), archive.read(info)
+        else:
+            count += 1
+            if count > MAX_BATCH_FILES:
+                raise BatchError(f"A batch may contain at most {MAX_BATCH_FILES} markdown files.")
+            data = f.read(MAX_INPUT_BYTES + 1)
+            if len(data) > MAX_INPUT_BYTES:
+                raise BatchError(f"{name} is larger than {MAX_INPUT_BYTES} bytes.")
+            yield _safe_name(f.name), data
+
+
+def _safe_name(name):
+    """Zip member path without absolute or '..' parts (it becomes an output path)."""
+    parts = [p for p in name.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+    return '/'.join(parts)
+
+
+def docx_name(name):
+    root, _ext = os.path.splitext(name)
+    return root + '.docx'
+
+
+class OutputNames:
+    """
+    docx output names for one batch, made unique: inputs that map to the
+    same name (two uploads called notes.md, or notes.md and notes.txt)
+    become notes.docx, notes-1.docx, notes-2.docx, ... Compared without
+    case, as on Windows / macOS file systems.
+    """
+
+    def __init__(self):
+        self._used = set()
+
+    def __call__(self, name):
+        candidate = docx_name(name)
+        n = 0
+        while candidate.lower() in self._used:
+            n += 1
+            candidate = docx_name(f"{os.path.splitext(name)[0]}-{n}")
+        self._used.add(candidate.lower())
+        return candidate
+
+
+# --- 2. Conversion (runs in the worker processes) ---
+def convert_one(item):
+    """(name, markdown bytes, converter class) -> (name, docx bytes, error)."""
+    name, data, converter_class = item
+    try:
+        md_text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return name, None, "File must be UTF-8 encoded text."
+    try:
+        document = converter_class().convert(md_text)
+        buffer = io.BytesIO()
+        document.save(buffer)
+    except Exception as e:
+        return name, None, str(e)
+    return name, buffer.getvalue(), None
+
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    """
+    forkserver (spawn where it is unavailable), never fork: the server
+    process runs threads (job workers, section pools, ...) and a forked
+    child can inherit a lock one of them held and deadlock on it.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def get_process_pool(workers=BATCH_WORKERS):
+    """Process-wide pool, so worker start-up (imports, docx template) is paid once."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        with _pool_lock:
+            if _pool is None or _pool_workers != workers:
+                if _pool is not None:
+                    _pool.shutdown(wait=False)
+                _pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+                _pool_workers = workers
+    return _pool
+
+
+def shutdown_process_pool():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = _pool_workers = None
+
+
+def convert_many(inputs, converter_class=TokenMarkdownToDocx, workers=BATCH_WORKERS):
+    """
+    Converts (name, markdown bytes) pairs across the process pool and yields
+    (name, docx bytes, error) in input order. workers=1 converts in-process.
+    """
+    items = ((name, data, converter_class) for name, data in inputs)
+    if workers <= 1:
+        yield from map(convert_one, items)
+        return
+    # A few inputs per task keeps IPC overhead low for small files
+    yield from get_process_pool(workers).map(convert_one, items, chunksize=4)
+
+
+# --- 3. Output ---
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink for zipfile; the bytes written so far are taken with take()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_docx_zip(results):
+    """
+    Writes (name, docx bytes, error) results into a zip archive and yields
+    the archive bytes as each file is added, so the response starts before
+    the last conversion finishes. Failures are listed in errors.txt.
+    """
+    sink = _ZipSink()
+    errors = []
+    output_name = OutputNames()
+    # .docx files are already deflated; storing them avoids compressing twice
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data, error in results:
+            if error is not None:
+                errors.append(f"{name}: {error}")
+                continue
+            archive.writestr(output_name(name), data)
+            yield sink.take()
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+    yield sink.take()
+
+
+def write_outputs(results, output_dir):
+    """Saves results under output_dir (keeping zip folder paths). Returns (converted, errors)."""
+    converted = 0
+    errors = []
+    output_name = OutputNames()
+    for name, data, error in results:
+        if error is not None:
+            errors.append((name, error))
+            continue
+        path = os.path.join(output_dir, output_name(name))
+        os.makedirs(os.path.dirname(path) or output_dir, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        converted += 1
+    return converted, errors
@@ -0,0 +1,105 @@
+import json
+import threading
+
+import boto3
+from botocore.config import Config
+from langchain_aws import ChatBedrock
+
+from .llm_cache import CachedChat, get_response_cache
+from .single_flight import SingleFlightChat
+
+DEFAULT_REGION = "us-east-1"
+DEFAULT_MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+DEFAULT_MODEL_KWARGS = {"temperature": 0.1, "max_tokens": 4096}
+
+# Enough HTTP connections for every section worker of several concurrent
+# requests, so threads don't queue on urllib3's pool.
+MAX_POOL_CONNECTIONS = 50
+
+# --- Process-wide pools (shared by every request and worker thread) ---
+_lock = threading.Lock()
+_clients = {}  # region -> boto3 bedrock-runtime client
+_chats = {}    # (region, model_id, model_kwargs json) -> ChatBedrock
+
+
+def _client_config():
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,           # keep TLS connections to Bedrock warm
+        connect_timeout=10,
+        read_timeout=300,             # 4096-token completions can take minutes
+        # Throttling and transient errors are retried by rate_governor, which
+        # also adapts its pacing to them; botocore retrying first would hide them.
+        retries={"total_max_attempts": 1, "mode": "standard"},
+    )
+
+
+def get_bedrock_client(region_name=DEFAULT_REGION):
+    """
+    Returns the shared bedrock-runtime client for a region, creating it once.
+    boto3 clients are thread-safe; only their creation needs the lock.
+    """
+    client = _clients.get(region_name)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(region_name)
+        if client is None:
+            # A private Session avoids racing on boto3's global default session.
+            session = boto3.session.Session()
+            client = session.client(
+                service_name="bedrock-runtime",
+                region_name=region_name,
+                verify=False,  # SSL Verify False for Corporate Proxy
+                config=_client_config(),
+            )
+            _clients[region_name] = client
+    return client
+
+
+def get_chat(region_name=DEFAULT_REGION, model_id=DEFAULT_MODEL_ID, model_kwargs=None):
+    """
+    Returns a shared ChatBedrock for (region, model_id, model_kwargs).
+    The same instance is reused across requests and section worker threads.
+    """
+    if model_kwargs is None:
+        model_kwargs = DEFAULT_MODEL_KWARGS
+    key = (region_name, model_id, json.dumps(model_kwargs, sort_keys=True))
+
+    chat = _chats.get(key)
+    if chat is not None:
+        return chat
+
+    client = get_bedrock_client(region_name)
+    with _lock:
+        chat = _chats.get(key)
+        if chat is None:
+            chat = ChatBedrock(
+                client=client,
+                model_id=model_id,
+                model_kwargs=dict(model_kwargs),
+            )
+            _chats[key] = chat
+    return chat
+
+
+def get_generation_chats(metrics=None, use_cache=True):
+    """
+    (chat, outline_chat) for one generation request, around the shared
+    ChatBedrock. Outermost wrapper last:
+      GovernedChat      paced to the model's quota, with backoff and retries when Bedrock throttles
+      SingleFlightChat  identical prompts already in flight (double submit, same uploads) share one call
+      CachedChat        identical section prompts are answered from the response cache (use_cache)
+    outline_chat stops before the response cache: complete outlines are kept
+    in the outline store, and a truncated one must be asked for again, not replayed.
+    """
+    # rate_governor imports this module for DEFAULT_MODEL_ID
+    from .rate_governor import GovernedChat
+
+    chat = GovernedChat(get_chat(), metrics=metrics)
+    chat = SingleFlightChat(chat, metrics)
+    outline_chat = chat
+    if use_cache:
+        chat = CachedChat(chat, get_response_cache(), metrics)
+    return chat, outline_chat
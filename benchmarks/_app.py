@@ -0,0 +1,31 @@
+"""
+Makes the repository importable as the 'docx_reader' app package, so the
+modules' relative imports (from .docx_tables import ...) resolve the same
+way they do inside the Django project.
+"""
+import os
+import sys
+import types
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+APP_PACKAGE = 'docx_reader'
+
+if APP_PACKAGE not in sys.modules:
+    package = types.ModuleType(APP_PACKAGE)
+    package.__path__ = [APP_DIR]
+    sys.modules[APP_PACKAGE] = package
+
+
+def load_forms():
+    """
+    forms.py lives in the Django project; its source is kept in the repo as
+    djangoForm_fewshotprompt.txt. Registers it as docx_reader.forms so the
+    view modules import. Needs Django settings to be configured first.
+    """
+    name = f'{APP_PACKAGE}.forms'
+    if name not in sys.modules:
+        module = types.ModuleType(name)
+        with open(os.path.join(APP_DIR, 'djangoForm_fewshotprompt.txt')) as f:
+            exec(compile(f.read(), f.name, 'exec'), module.__dict__)
+        sys.modules[name] = module
+    return sys.modules[name]
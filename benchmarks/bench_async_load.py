@@ -0,0 +1,113 @@
+"""
+Load test: N concurrent clients each reading a whole strategy page, from the
+sync stream_strategy_generator (one server thread per active stream, as
+Django does for sync iterators) against astream_strategy_generator on one
+event loop. The model is an LLM stand-in with a fixed per-token latency.
+
+    python benchmarks/bench_async_load.py --clients 10 100 300 --threads 32
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+settings.configure(ROOT_URLCONF='docx_reader.artifact_store')
+
+_tmp = tempfile.mkdtemp(prefix='bench_async_load_')
+os.environ['ARTIFACT_DIR'] = os.path.join(_tmp, 'artifacts')
+os.environ['OUTLINE_STORE_PATH'] = os.path.join(_tmp, 'outline.sqlite3')
+
+import _app
+from fake_llm import FakeChat
+
+_app.load_forms()
+import docx_reader.Django_FewShotPropmpt_view as view
+import docx_reader.bedrock_client as bedrock_client
+
+SECTIONS = ["1. Scope", "2. Risks", "3. Approach", "4. Environments"]
+
+
+class PeakThreads:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_sync(clients, threads):
+    started = time.perf_counter()
+
+    def client(i):
+        first = None
+        for _ in view.stream_strategy_generator('drs', 'sample strategy', f'target {i}', use_cache=False):
+            if first is None:
+                first = time.perf_counter() - started
+        return first
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        firsts = list(pool.map(client, range(clients)))
+    return time.perf_counter() - started, firsts
+
+
+def run_async(clients):
+    async def main():
+        started = time.perf_counter()
+
+        async def client(i):
+            first = None
+            async for _ in view.astream_strategy_generator('drs', 'sample strategy', f'target {i}', use_cache=False):
+                if first is None:
+                    first = time.perf_counter() - started
+            return first
+
+        firsts = await asyncio.gather(*(client(i) for i in range(clients)))
+        return time.perf_counter() - started, firsts
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 100, 300])
+    parser.add_argument('--threads', type=int, default=32, help='server threads available to sync streams')
+    parser.add_argument('--tokens', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    chat = FakeChat(SECTIONS, args.tokens, args.latency)
+    bedrock_client.get_chat = lambda: chat
+    # One sample strategy for everyone: its outline is stored before the run
+    view.get_outline_store().put('sample strategy', view.FLAT, SECTIONS)
+
+    print(f"{'clients':>7} {'mode':6} {'wall s':>8} {'p95 first byte s':>17} {'peak threads':>13}")
+    for clients in args.clients:
+        for mode in ('sync', 'async'):
+            with PeakThreads() as threads:
+                if mode == 'sync':
+                    wall, firsts = run_sync(clients, args.threads)
+                else:
+                    wall, firsts = run_async(clients)
+            p95 = statistics.quantiles(firsts, n=20)[-1] if len(firsts) > 1 else firsts[0]
+            print(f"{clients:7} {mode:6} {wall:8.2f} {p95:17.2f} {threads.peak:13}")
+
+
+if __name__ == '__main__':
+    main()
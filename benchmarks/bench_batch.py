@@ -0,0 +1,37 @@
+"""
+Batch Markdown -> DOCX throughput (batch_convert.convert_many) by number of
+worker processes; should scale with cores up to the CPU count.
+
+    python benchmarks/bench_batch.py --files 200 --pages 5 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from corpus import strategy_markdown
+from docx_reader.batch_convert import convert_many, shutdown_process_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=100)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    data = strategy_markdown(args.pages).encode('utf-8')
+    inputs = [(f"strategy_{i}.md", data) for i in range(args.files)]
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'seconds':>8} {'files/s':>8}")
+    for workers in args.workers:
+        list(convert_many(inputs[:workers], workers=workers))  # start the pool
+        start = time.perf_counter()
+        converted = sum(1 for _name, _data, error in convert_many(inputs, workers=workers) if error is None)
+        seconds = time.perf_counter() - start
+        print(f"{workers:7} {seconds:8.2f} {converted / seconds:8.1f}")
+        shutdown_process_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Time from the last section's content to a downloadable .docx: converting
+the whole strategy after the last model call (the old end-of-run build)
+against StrategyArtifacts, which converts each section in the background
+while the next one is being generated.
+
+    python benchmarks/bench_docx_assembly.py --sections 40 --latency 0.2
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ['ARTIFACT_DIR'] = tempfile.mkdtemp(prefix='bench_docx_assembly_')
+
+import _app  # noqa: F401,E402  (registers the docx_reader package)
+from docx_reader.artifact_store import StrategyArtifacts, artifact_path  # noqa: E402
+from docx_reader.md_token_converter import TokenMarkdownToDocx  # noqa: E402
+
+from corpus import strategy_markdown  # noqa: E402
+
+
+def end_of_run(sections, latency):
+    for _ in sections:
+        time.sleep(latency)  # model call
+    start = time.perf_counter()
+    converter = TokenMarkdownToDocx()
+    converter._add_paragraph("Test Strategy Document", "Title")
+    for title, content in sections:
+        converter._add_paragraph(title, "Heading 2")
+        converter.convert(content)
+    converter.document.save(os.path.join(os.environ['ARTIFACT_DIR'], 'end_of_run.docx'))
+    return time.perf_counter() - start
+
+
+def incremental(sections, latency):
+    artifacts = StrategyArtifacts(("docx",), docx_title="Test Strategy Document")
+    for title, content in sections:
+        time.sleep(latency)  # model call
+        artifacts.add_section(title, content)
+    start = time.perf_counter()
+    tokens = artifacts.finish()
+    elapsed = time.perf_counter() - start
+    assert os.path.getsize(artifact_path(tokens['docx']))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds per model call')
+    args = parser.parse_args()
+
+    # One page of mixed markdown (headings, lists, a table) per section
+    sections = [(f"Section {i}", strategy_markdown(1)) for i in range(args.sections)]
+    before = end_of_run(sections, args.latency)
+    after = incremental(sections, args.latency)
+    print(f"{'sections':>8} {'end of run ms':>14} {'incremental ms':>15}")
+    print(f"{args.sections:8} {before * 1000:14.1f} {after * 1000:15.1f}")
+
+
+if __name__ == '__main__':
+    main()
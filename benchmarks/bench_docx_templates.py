@@ -0,0 +1,73 @@
+"""
+Template loading: docx.Document(path) against the cached copy from
+docx_templates.load_template(path), on a template with a header logo.
+First checks that a picture added to the copy is saved like one added to
+a freshly opened document (same zip members, no duplicate image names).
+
+    python benchmarks/bench_docx_templates.py --repeat 50
+"""
+import argparse
+import io
+import os
+import struct
+import sys
+import tempfile
+import time
+import warnings
+import zipfile
+import zlib
+
+import docx
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.docx_templates import load_template
+
+
+def png(rgb, size=4):
+    """A tiny solid-colour PNG."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    rows = b''.join(b'\x00' + bytes(rgb) * size for _ in range(size))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def build_template(path):
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].add_run().add_picture(io.BytesIO(png((200, 0, 0))))
+    document.save(path)
+
+
+def saved_members(document):
+    """Zip member names after adding a picture and saving, plus any warnings raised."""
+    document.add_picture(io.BytesIO(png((0, 0, 200))))
+    buffer = io.BytesIO()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        document.save(buffer)
+    return sorted(zipfile.ZipFile(buffer).namelist()), [str(w.message) for w in caught]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='bench_templates_'), 'template.docx')
+    build_template(path)
+
+    expected = saved_members(docx.Document(path))
+    if saved_members(load_template(path)) != expected:
+        sys.exit("MISMATCH: a picture added to the cached template copy is saved differently")
+
+    print(f"{'load':22} {'ms':>8}")
+    for name, load in (('docx.Document(path)', docx.Document), ('load_template(path)', load_template)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            load(path)
+        print(f"{name:22} {(time.perf_counter() - start) / args.repeat * 1000:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Per-section DRS retrieval (drs_index) on a large synthetic DRS: prompt size
+with the whole DRS against the retrieved excerpts, index build and query
+time, how many retrieved chunks come from the section's own topic
+(precision), the share of that topic's chunks retrieved (topic recall) and
+the score-mass recall the generators record per section.
+
+    python benchmarks/bench_drs_retrieval.py --pages 150 --recall 0.8 --max-chars 48000
+"""
+import argparse
+import time
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.drs_index import RETRIEVAL_MAX_CHARS, RETRIEVAL_RECALL, DrsIndex
+from docx_reader.prompt_context import estimate_tokens
+
+from corpus import REQUIREMENT_TOPICS, requirements_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=150)
+    parser.add_argument('--recall', type=float, default=RETRIEVAL_RECALL)
+    parser.add_argument('--max-chars', type=int, default=RETRIEVAL_MAX_CHARS)
+    args = parser.parse_args()
+
+    text = requirements_text(args.pages)
+    start = time.perf_counter()
+    index = DrsIndex.from_text(text)
+    build = time.perf_counter() - start
+    print(f"DRS: {len(text):,} chars (~{estimate_tokens(text):,} tokens), "
+          f"{len(index.chunks)} chunks, index built in {build * 1000:.1f} ms")
+
+    print(f"{'section':16} {'chunks':>6} {'tokens':>7} {'saved':>6} {'prec':>5} "
+          f"{'topic':>6} {'recall':>7} {'query ms':>9}")
+    for topic in REQUIREMENT_TOPICS:
+        title = f"{topic} Testing"
+        start = time.perf_counter()
+        ids, recall = index.search(title, args.recall, args.max_chars)
+        excerpts = index.excerpts(ids)
+        query = time.perf_counter() - start
+        relevant = sum(topic in index.chunks[i].heading for i in ids)
+        in_topic = sum(topic in chunk.heading for chunk in index.chunks)
+        print(f"{topic:16} {len(ids):6} {estimate_tokens(excerpts):7} {1 - len(excerpts) / len(text):6.1%} "
+              f"{relevant / len(ids):5.2f} {relevant / in_topic:6.2f} {recall:7.2f} {query * 1000:9.2f}")
+
+
+if __name__ == '__main__':
+    main()
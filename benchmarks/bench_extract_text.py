@@ -0,0 +1,106 @@
+"""
+Compares the old extract_text (python-docx Document + paragraph list,
+read().decode() for text) against the streaming text_extraction module.
+
+    python benchmarks/bench_extract_text.py --pages 500
+"""
+import argparse
+import io
+import tempfile
+import time
+import tracemalloc
+
+import docx
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.text_extraction import extract_text
+
+
+class _Upload(io.BytesIO):
+    """Stands in for a Django UploadedFile (has .name)."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def legacy_extract_text(uploaded_file):
+    filename = uploaded_file.name.lower()
+    if filename.endswith('.docx'):
+        doc = docx.Document(uploaded_file)
+        full_text = [para.text for para in doc.paragraphs]
+        return '\n'.join(full_text)
+    else:
+        return uploaded_file.read().decode('utf-8')
+
+
+def build_docx(pages, paragraphs_per_page=12, table_every=5):
+    doc = docx.Document()
+    for page in range(pages):
+        doc.add_heading(f"Requirement group {page}", level=2)
+        for i in range(paragraphs_per_page):
+            doc.add_paragraph(f"REQ-{page}-{i}: The system shall process input {i} within the agreed SLA. " * 2)
+        if page % table_every == 0:
+            table = doc.add_table(rows=10, cols=4)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"r{r}c{c}"
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def build_text(pages, lines_per_page=50):
+    line = "REQ-0000: The system shall process the input within the agreed SLA. ✓\n"
+    return (line * lines_per_page * pages).encode('utf-8')
+
+
+class _DiskUpload:
+    """Stands in for a TemporaryUploadedFile: the body is in a file on disk."""
+
+    def __init__(self, data, name):
+        self.file = tempfile.TemporaryFile()
+        self.file.write(data)
+        self.file.seek(0)
+        self.name = name
+        self.size = len(data)
+
+    def read(self, *args):
+        return self.file.read(*args)
+
+
+def measure(func, data, name, repeat, upload=_Upload):
+    best = float('inf')
+    peak = 0
+    for _ in range(repeat):
+        uploaded = upload(data, name)
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(uploaded)
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    text = build_text(args.pages)
+    cases = [
+        ('docx', 'drs.docx', build_docx(args.pages), _Upload),
+        ('text', 'drs.md', text, _Upload),
+        ('text (disk)', 'drs.md', text, _DiskUpload),
+    ]
+    print(f"{'case':12} {'impl':10} {'seconds':>9} {'peak MiB':>9}")
+    for label, name, data, upload in cases:
+        for impl, func in (('legacy', legacy_extract_text), ('streaming', extract_text)):
+            seconds, peak = measure(func, data, name, args.repeat, upload)
+            print(f"{label:12} {impl:10} {seconds:9.3f} {peak / 2**20:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
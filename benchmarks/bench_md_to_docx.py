@@ -0,0 +1,159 @@
+"""
+Throughput of the Markdown -> DOCX converters on generated strategies:
+the HTML + BeautifulSoup path (MarkdownToDocx, mdToDocSubHeading.py)
+against the markdown-it token path (md_token_converter.TokenMarkdownToDocx).
+Also checks both produce the same paragraphs, styles and tables.
+
+    python benchmarks/bench_md_to_docx.py --sections 200
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+import markdown
+from bs4 import BeautifulSoup
+from docx import Document
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.md_token_converter import TokenMarkdownToDocx
+
+
+class HtmlMarkdownToDocx:
+    """The HTML round-trip converter from mdToDocSubHeading.py."""
+
+    def __init__(self):
+        self.document = Document()
+
+    def convert(self, md_text):
+        html = markdown.markdown(md_text, extensions=['tables', 'fenced_code'])
+        soup = BeautifulSoup(html, 'html.parser')
+        for element in soup.find_all(recursive=False):
+            self._process_element(element)
+        return self.document
+
+    def _process_element(self, element):
+        tag = element.name
+        if tag.startswith('h') and len(tag) == 2:
+            try:
+                level = int(tag[1])
+                if 1 <= level <= 9:
+                    self.document.add_heading(element.get_text(), level=level)
+            except ValueError:
+                pass
+        elif tag == 'p':
+            self.document.add_paragraph(element.get_text())
+        elif tag in ['ul', 'ol']:
+            self._process_list(element, level=1)
+        elif tag == 'table':
+            self._process_table(element)
+
+    def _process_list(self, list_element, level=1):
+        is_ordered = list_element.name == 'ol'
+        base_style = 'List Number' if is_ordered else 'List Bullet'
+        style_name = f"{base_style} {level}" if level > 1 else base_style
+        for li in list_element.find_all('li', recursive=False):
+            text_parts = []
+            nested_lists = []
+            for child in li.contents:
+                if child.name in ['ul', 'ol']:
+                    nested_lists.append(child)
+                else:
+                    text_parts.append(child.get_text() if child.name else str(child))
+            item_text = "".join(text_parts).strip()
+            if item_text:
+                try:
+                    self.document.add_paragraph(item_text, style=style_name)
+                except KeyError:
+                    self.document.add_paragraph(item_text, style=base_style)
+            for nested in nested_lists:
+                self._process_list(nested, level=level + 1)
+
+    def _process_table(self, table_element):
+        rows = table_element.find_all('tr')
+        if not rows:
+            return
+        num_cols = len(rows[0].find_all(['th', 'td']))
+        table = self.document.add_table(rows=len(rows), cols=num_cols)
+        table.style = 'Table Grid'
+        for i, row in enumerate(rows):
+            cols = row.find_all(['th', 'td'])
+            for j, col in enumerate(cols):
+                if j < num_cols:
+                    cell = table.cell(i, j)
+                    cell.text = col.get_text().strip()
+                    if row.find('th'):
+                        for paragraph in cell.paragraphs:
+                            for run in paragraph.runs:
+                                run.font.bold = True
+
+
+def build_markdown(sections, table_rows=8):
+    """A generated-strategy-shaped document (4-space nesting works for both parsers)."""
+    out = []
+    for s in range(sections):
+        out.append(f"## {s}. Section {s}\n")
+        out.append(f"This section covers **scope** item {s} and the `api/{s}` endpoint.\nSecond line.\n")
+        out.append(f"### Sub-section {s}.1\n")
+        for i in range(4):
+            out.append(f"- Bullet {i} for section {s}")
+            out.append(f"    - Nested {i}.a")
+            out.append(f"        - Deep {i}.a.i")
+        out.append("")
+        out.append("Execution steps:\n")
+        for i in range(3):
+            out.append(f"{i + 1}. Step {i}")
+        out.append("")
+        out.append("| ID | Requirement | Priority |")
+        out.append("|----|-------------|----------|")
+        for r in range(table_rows):
+            out.append(f"| R{s}-{r} | Validate input {r} | High |")
+        out.append("")
+    return "\n".join(out)
+
+
+def snapshot(document):
+    paragraphs = [(p.style.name, p.text) for p in document.paragraphs]
+    tables = [[[c.text for c in row.cells] for row in t.rows] for t in document.tables]
+    bold = [[bool(run.font.bold) for c in t.rows[0].cells for p in c.paragraphs for run in p.runs]
+            for t in document.tables]
+    return paragraphs, tables, bold
+
+
+def measure(cls, md_text, repeat):
+    best = float('inf')
+    peak = 0
+    document = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        document = cls().convert(md_text)
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best, peak, document
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    md_text = build_markdown(args.sections)
+    size_kib = len(md_text.encode('utf-8')) / 1024
+
+    html_seconds, html_peak, html_doc = measure(HtmlMarkdownToDocx, md_text, args.repeat)
+    token_seconds, token_peak, token_doc = measure(TokenMarkdownToDocx, md_text, args.repeat)
+
+    if snapshot(html_doc) != snapshot(token_doc):
+        sys.exit("MISMATCH: token converter output differs from the HTML path")
+
+    print(f"{args.sections} sections, {size_kib:.0f} KiB of markdown")
+    print(f"{'path':12} {'seconds':>9} {'KiB/s':>9} {'peak MiB':>9}")
+    for name, seconds, peak in (('html+soup', html_seconds, html_peak), ('tokens', token_seconds, token_peak)):
+        print(f"{name:12} {seconds:9.3f} {size_kib / seconds:9.0f} {peak / 2**20:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
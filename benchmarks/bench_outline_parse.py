@@ -0,0 +1,80 @@
+"""
+Outline reply parsing: the previous greedy-regex + json.loads parser
+against the tolerant OutlineParser, over a mix of clean and malformed
+outline replies (code fences, prose with brackets, trailing commas,
+single quotes, truncation, invalid elements). Reports the share of
+replies each accepts (a rejected reply meant a failed run and another
+outline call), sections recovered and parse time.
+
+    python benchmarks/bench_outline_parse.py --sections 25 --repeat 200
+"""
+import argparse
+import json
+import re
+import time
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.outline_parser import STRUCTURED, OutlineError, parse_outline
+
+
+def regex_parse(raw_content):
+    """The parser before the tolerant one (outline_store.parse_outline)."""
+    match = re.search(r'\[.*\]', raw_content, re.DOTALL)
+    sections = json.loads(match.group(0) if match else raw_content)
+    # The structured generator then failed on sec["title"]
+    if not all(isinstance(sec, dict) and sec.get("title") for sec in sections):
+        raise ValueError("section without a title")
+    return sections
+
+
+def replies(sections):
+    """(kind, reply, sections a correct parse recovers) for each failure mode seen in practice."""
+    items = [{"title": f"Section {n}", "level": 1 + n % 3} for n in range(sections)]
+    clean = json.dumps(items, indent=2)
+    cut = clean[:clean.index(f'"Section {sections - 1}"') + 8]
+    return [
+        ("clean", clean, sections),
+        ("fenced", f"```json\n{clean}\n```", sections),
+        ("preamble", f"Here is the outline [{sections} sections]:\n{clean}", sections),
+        ("epilogue", f"{clean}\nNote: sections [3] and [4] can be merged.", sections),
+        ("trailing_comma", clean[:-2] + ",\n]", sections),
+        ("single_quotes", clean.replace('"', "'"), sections),
+        ("truncated", cut, sections - 1),
+        ("bad_element", clean[:-2] + ',\n  {"level": 2}\n]', sections),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    cases = replies(args.sections)
+    print(f"{'reply':16} {'regex':>12} {'tolerant':>12} {'regex µs':>9} {'tolerant µs':>12}")
+    accepted = {"regex": 0, "tolerant": 0}
+    for kind, reply, expected in cases:
+        row = []
+        for name, parse in (("regex", regex_parse),
+                            ("tolerant", lambda r: parse_outline(r, STRUCTURED).sections)):
+            try:
+                found = len(parse(reply))
+            except (ValueError, OutlineError):
+                found = None
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                try:
+                    parse(reply)
+                except (ValueError, OutlineError):
+                    pass
+            micros = (time.perf_counter() - start) / args.repeat * 1e6
+            ok = found is not None and found >= expected
+            accepted[name] += ok
+            row.append((f"{found}/{expected}" if found is not None else "failed", micros))
+        (regex, regex_us), (tolerant, tolerant_us) = row
+        print(f"{kind:16} {regex:>12} {tolerant:>12} {regex_us:9.1f} {tolerant_us:12.1f}")
+    print(f"accepted: regex {accepted['regex']}/{len(cases)}, tolerant {accepted['tolerant']}/{len(cases)}")
+
+
+if __name__ == '__main__':
+    main()
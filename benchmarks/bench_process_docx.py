@@ -0,0 +1,95 @@
+"""
+Compares the old process_docx extraction loop (python-docx Paragraph/Table
+wrappers, para.style.name per paragraph, cell.text per cell) against
+docx_blocks.extract_content_blocks, and checks both give the same blocks.
+
+    python benchmarks/bench_process_docx.py --pages 500
+"""
+import argparse
+import io
+import sys
+import time
+
+import docx
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.docx_blocks import extract_content_blocks
+
+
+def legacy_content_blocks(doc):
+    content_blocks = []
+    for element in doc.element.body:
+        if element.tag.endswith('p'):
+            para = Paragraph(element, doc)
+            text = para.text.strip()
+            if text:
+                style_name = para.style.name if para.style else ""
+                if style_name.startswith('Heading'):
+                    try:
+                        level = int(style_name.split()[-1])
+                    except ValueError:
+                        level = 2
+                    content_blocks.append({'type': 'heading', 'content': text, 'level': level})
+                else:
+                    content_blocks.append({'type': 'text', 'content': text})
+        elif element.tag.endswith('tbl'):
+            table = Table(element, doc)
+            table_data = []
+            for row in table.rows:
+                row_data = [cell.text.strip() for cell in row.cells]
+                table_data.append(row_data)
+            content_blocks.append({'type': 'table', 'content': table_data})
+    return content_blocks
+
+
+def build_document(pages, paragraphs_per_page=10, table_rows=20, table_cols=6):
+    doc = docx.Document()
+    for page in range(pages):
+        doc.add_heading(f"Section {page}", level=1)
+        doc.add_heading(f"Requirements {page}", level=2)
+        for i in range(paragraphs_per_page):
+            doc.add_paragraph(f"REQ-{page}-{i}: The system shall validate input {i} and log the outcome.")
+        if page % 2 == 0:
+            table = doc.add_table(rows=table_rows, cols=table_cols)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"{page}:{r}:{c}"
+        doc.add_page_break()
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def best_of(func, doc, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(doc)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    doc = docx.Document(io.BytesIO(build_document(args.pages)))
+
+    legacy_seconds, legacy_blocks = best_of(legacy_content_blocks, doc, args.repeat)
+    fast_seconds, fast_blocks = best_of(extract_content_blocks, doc, args.repeat)
+
+    if legacy_blocks != fast_blocks:
+        sys.exit("MISMATCH: extract_content_blocks differs from the legacy loop")
+
+    print(f"{args.pages} pages, {len(fast_blocks)} blocks")
+    print(f"legacy loop : {legacy_seconds:8.3f}s")
+    print(f"raw XML walk: {fast_seconds:8.3f}s  ({legacy_seconds / fast_seconds:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
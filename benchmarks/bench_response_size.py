@@ -0,0 +1,58 @@
+"""
+Response size of the structured strategy stream (generatejsonforteststrategy)
+now that .md / .json downloads come from the artifact store, against the
+bytes the old final-md-content / final-json-content hidden divs added.
+
+    python benchmarks/bench_response_size.py --sections 40 --section-chars 6000
+"""
+import argparse
+import os
+import tempfile
+
+from django.conf import settings
+
+settings.configure(ROOT_URLCONF='docx_reader.artifact_store')
+
+_tmp = tempfile.mkdtemp(prefix='bench_response_size_')
+os.environ['ARTIFACT_DIR'] = os.path.join(_tmp, 'artifacts')
+os.environ['OUTLINE_STORE_PATH'] = os.path.join(_tmp, 'outline.sqlite3')
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from fake_llm import FakeChat
+
+import docx_reader.bedrock_client as bedrock_client
+import docx_reader.generatejsonforteststrategy as strategy
+from docx_reader.artifact_store import artifact_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', type=int, default=40)
+    parser.add_argument('--section-chars', type=int, default=6000)
+    args = parser.parse_args()
+
+    sections = [{"title": f"Section {i}", "level": 1 + i % 3} for i in range(args.sections)]
+    # The section body arrives in 500-character chunks
+    chunk = ("The system under test shall be verified against each requirement. " * 8)[:500]
+    chat = FakeChat(sections, tokens=max(1, args.section_chars // 500), token_text=chunk)
+    bedrock_client.get_chat = lambda: chat
+    tokens = {}
+    finish = strategy.StrategyArtifacts.finish
+
+    def capture(self):
+        tokens.update(finish(self))
+        return tokens
+
+    strategy.StrategyArtifacts.finish = capture
+    response = ''.join(strategy.stream_strategy_generator('drs', 'sample strategy', 'target', use_cache=False))
+    response_bytes = len(response.encode('utf-8'))
+
+    # The old hidden divs carried the full .md and .json once more each
+    hidden = sum(os.path.getsize(artifact_path(token)) for token in tokens.values())
+    before = response_bytes + hidden
+    print(f"{'sections':>8} {'before KiB':>11} {'after KiB':>10} {'saved':>6}")
+    print(f"{args.sections:8} {before / 1024:11.1f} {response_bytes / 1024:10.1f} {1 - response_bytes / before:6.0%}")
+
+
+if __name__ == '__main__':
+    main()
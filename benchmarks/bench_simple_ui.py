@@ -0,0 +1,64 @@
+"""
+Per-request render cost of the converter upload page (MdToDocxView GET and invalid POST):
+building django.template.Template from the inline HTML on every request
+(the old _render_simple_ui) against the compiled template cached in mdtodoc (GET pages, whose form is
+unbound, are rendered once).
+
+    python benchmarks/bench_simple_ui.py --requests 2000
+"""
+import argparse
+import time
+
+from django.conf import settings
+
+settings.configure(
+    TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+    ALLOWED_HOSTS=['testserver'],
+)
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.http import HttpResponse  # noqa: E402
+from django.template import Context, Template  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+import _app  # noqa: F401,E402  (registers the docx_reader package)
+from docx_reader.mdtodoc import SIMPLE_UI_HTML, MdToDocxView  # noqa: E402
+
+
+class UncachedView(MdToDocxView):
+    """The old _render_simple_ui: a new Template per request."""
+
+    def _render_simple_ui(self, request, form):
+        t = Template(SIMPLE_UI_HTML)
+        return HttpResponse(t.render(Context({'form': form}, autoescape=False)))
+
+
+def per_request(view, request, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        view(request)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    factory = RequestFactory()
+    uncached, cached = UncachedView.as_view(), MdToDocxView.as_view()
+    print(f"{'request':14} {'per call us':>12} {'cached us':>10} {'speedup':>8}")
+    for label, request in (('GET', factory.get('/convert/')), ('invalid POST', factory.post('/convert/', {}))):
+        # Warm-up: form widget templates, the cached page template
+        uncached(request)
+        cached(request)
+        before = per_request(uncached, request, args.requests)
+        after = per_request(cached, request, args.requests)
+        print(f"{label:14} {before * 1e6:12.1f} {after * 1e6:10.1f} {before / after:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Single-flight coalescing: --users threads submit the same outline and
+section prompts at once (double submits, same uploads), straight to the
+model and through SingleFlightChat. Reports model calls made, wall time
+and the "coalesced" counter.
+
+    python benchmarks/bench_single_flight.py --users 8 --sections 6
+"""
+import argparse
+import threading
+import time
+
+from langchain_core.messages import HumanMessage
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.metrics import RunMetrics
+from docx_reader.single_flight import FlightGroup, SingleFlightChat
+from fake_llm import FakeChat
+
+
+class CountingChat(FakeChat):
+    """FakeChat that counts the calls reaching the model."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _count(self):
+        with self._lock:
+            self.calls += 1
+
+    def invoke(self, messages):
+        self._count()
+        return super().invoke(messages)
+
+    def stream(self, messages):
+        self._count()
+        return super().stream(messages)
+
+
+def run(chat, users, sections):
+    def user():
+        chat.invoke([HumanMessage(content="outline")])
+        for n in range(sections):
+            "".join(chunk.content for chunk in chat.stream([HumanMessage(content=f"section {n}")]))
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=user) for _ in range(users)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--sections', type=int, default=6)
+    parser.add_argument('--tokens', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.005, help='seconds between streamed chunks')
+    args = parser.parse_args()
+
+    titles = [f"Section {n}" for n in range(args.sections)]
+    print(f"{args.users} users x (1 outline + {args.sections} sections)")
+    print(f"{'':14} {'model calls':>11} {'seconds':>8} {'coalesced':>10}")
+
+    model = CountingChat(titles, args.tokens, args.latency)
+    seconds = run(model, args.users, args.sections)
+    print(f"{'direct':14} {model.calls:11} {seconds:8.2f} {0:10}")
+
+    model = CountingChat(titles, args.tokens, args.latency)
+    metrics = RunMetrics('bench')
+    seconds = run(SingleFlightChat(model, metrics, FlightGroup()), args.users, args.sections)
+    print(f"{'single-flight':14} {model.calls:11} {seconds:8.2f} {metrics.counters.get('coalesced', 0):10}")
+
+
+if __name__ == '__main__':
+    main()
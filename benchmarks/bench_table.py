@@ -0,0 +1,69 @@
+"""
+Table construction cost: table.cell(i, j) + cell.text per cell (the old
+_process_table) against docx_tables.add_table_bulk, on a markdown table
+converted end to end with TokenMarkdownToDocx.
+
+    python benchmarks/bench_table.py --rows 1000 --cols 10
+"""
+import argparse
+import time
+
+from docx import Document
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader.docx_tables import add_table_bulk
+from docx_reader.md_token_converter import TokenMarkdownToDocx
+
+
+def per_cell_table(document, rows, header_rows):
+    num_cols = len(rows[0])
+    table = document.add_table(rows=len(rows), cols=num_cols)
+    table.style = 'Table Grid'
+    for i, cols in enumerate(rows):
+        for j, text in enumerate(cols):
+            if j < num_cols:
+                cell = table.cell(i, j)
+                cell.text = text
+                if header_rows[i]:
+                    for paragraph in cell.paragraphs:
+                        for run in paragraph.runs:
+                            run.font.bold = True
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--cols', type=int, default=10)
+    parser.add_argument('--skip-per-cell', action='store_true', help='The old path is slow on big tables.')
+    args = parser.parse_args()
+
+    rows = [[f"Header {c}" for c in range(args.cols)]]
+    rows += [[f"r{r}c{c}" for c in range(args.cols)] for r in range(args.rows)]
+    header_rows = [True] + [False] * args.rows
+
+    results = []
+    if not args.skip_per_cell:
+        start = time.perf_counter()
+        per_cell_table(Document(), rows, header_rows)
+        results.append(('table.cell per cell', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    add_table_bulk(Document(), rows, header_rows)
+    results.append(('add_table_bulk', time.perf_counter() - start))
+
+    md_table = "\n".join(
+        ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * args.cols]
+        + ["| " + " | ".join(row) + " |" for row in rows[1:]]
+    )
+    start = time.perf_counter()
+    TokenMarkdownToDocx().convert(md_table)
+    results.append(('markdown -> docx (tokens)', time.perf_counter() - start))
+
+    print(f"{args.rows} x {args.cols} table")
+    for name, seconds in results:
+        print(f"{name:28} {seconds:8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
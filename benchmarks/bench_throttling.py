@@ -0,0 +1,97 @@
+"""
+Rate governor under a simulated Bedrock quota: a backend that serves at
+most --capacity concurrent calls and answers the rest with
+ThrottlingException. Many threads hammer it directly (one attempt per
+call, as before) and through GovernedChat; reports completed calls/s
+against the capacity, failed calls and throttles.
+
+    python benchmarks/bench_throttling.py --threads 32 --capacity 4 --calls 20
+"""
+import argparse
+import logging
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+import _app  # noqa: F401  (registers the docx_reader package)
+from docx_reader import rate_governor
+from docx_reader.metrics import RunMetrics
+
+
+class QuotaBackend:
+    """Stand-in for ChatBedrock.invoke with a hard concurrency quota."""
+    model_id = 'quota'
+    model_kwargs = {}
+
+    def __init__(self, capacity, latency):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.in_flight += 1
+            over = self.in_flight > self.capacity
+        try:
+            if over:
+                error = {"Error": {"Code": "ThrottlingException", "Message": "Too many requests"}}
+                raise ClientError(error, "InvokeModel")
+            time.sleep(self.latency)
+            return "ok"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def run(chat, threads, calls):
+    failures = []
+
+    def worker():
+        for _ in range(calls):
+            try:
+                chat.invoke("prompt")
+            except Exception as e:
+                failures.append(e)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start, len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--capacity', type=int, default=4)
+    parser.add_argument('--calls', type=int, default=20, help='calls per thread')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per successful call')
+    args = parser.parse_args()
+    logging.getLogger('docx_reader').setLevel(logging.ERROR)
+    # Scale the backoff to the simulated call latency
+    rate_governor.BACKOFF_BASE = args.latency / 2
+    rate_governor.BACKOFF_MAX = args.latency * 20
+
+    total = args.threads * args.calls
+    ceiling = args.capacity / args.latency
+    print(f"{total} calls, quota {args.capacity} concurrent = {ceiling:.0f} calls/s at best")
+    print(f"{'':10} {'calls/s':>8} {'of quota':>9} {'failed':>7} {'throttles':>10}")
+
+    seconds, failed = run(QuotaBackend(args.capacity, args.latency), args.threads, args.calls)
+    print(f"{'direct':10} {(total - failed) / seconds:8.1f} {(total - failed) / seconds / ceiling:9.0%} {failed:7} {failed:10}")
+
+    metrics = RunMetrics('bench')
+    backend = QuotaBackend(args.capacity, args.latency)
+    chat = rate_governor.GovernedChat(backend, rate_governor.RateGovernor(backend.model_id), metrics)
+    seconds, failed = run(chat, args.threads, args.calls)
+    done = total - failed
+    print(f"{'governed':10} {done / seconds:8.1f} {done / seconds / ceiling:9.0%} {failed:7} "
+          f"{metrics.counters.get('throttles', 0):10}")
+
+
+if __name__ == '__main__':
+    main()
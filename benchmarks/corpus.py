@@ -0,0 +1,117 @@
+"""
+Synthetic, deterministic corpora for the benchmarks, sized in "pages"
+(roughly one printed page of generated strategy / DRS text each).
+"""
+import io
+
+PARAGRAPH = ("The system under test shall be verified against requirement {i} "
+             "using the agreed entry and exit criteria. ")
+
+
+def strategy_markdown(pages):
+    """Mixed LLM-style strategy: headings, paragraphs, shallow lists and a small table per page."""
+    parts = []
+    for page in range(pages):
+        parts.append(f"## {page + 1}. Section {page}\n")
+        parts.append(f"### {page + 1}.1 Overview\n")
+        for i in range(4):
+            parts.append(PARAGRAPH.format(i=i) * 2 + "\n")
+        parts.append("\n".join(f"- Risk {i}: data loss on interface {i}" for i in range(5)) + "\n")
+        parts.append("  - Mitigation: replay from the audit log\n")
+        parts.append("\nSteps:\n\n" + "\n".join(f"{i}. Execute step {i}" for i in range(1, 5)) + "\n")
+        parts.append("| Area | Owner | Priority |\n|---|---|---|\n")
+        parts.append("\n".join(f"| Area {i} | Team {i % 3} | P{i % 4} |" for i in range(6)) + "\n")
+    return "\n".join(parts)
+
+
+def table_heavy_markdown(pages, rows=40, cols=8):
+    """One large table per page (traceability matrices)."""
+    parts = []
+    header = "| " + " | ".join(f"Col {c}" for c in range(cols)) + " |"
+    rule = "|" + "---|" * cols
+    for page in range(pages):
+        parts.append(f"## Matrix {page}\n")
+        parts.append(header)
+        parts.append(rule)
+        for r in range(rows):
+            parts.append("| " + " | ".join(f"R{r}C{c} req-{page}" for c in range(cols)) + " |")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def nested_list_markdown(pages, depth=6, width=3):
+    """Deeply nested bullet / numbered lists (2-space indents, as LLMs write them)."""
+    def items(level, ordered):
+        lines = []
+        for i in range(width):
+            marker = f"{i + 1}." if ordered else "-"
+            indent = "   " * level if ordered else "  " * level
+            lines.append(f"{indent}{marker} Level {level} item {i}")
+            if level + 1 < depth and i == 0:
+                lines.extend(items(level + 1, ordered))
+        return lines
+
+    parts = []
+    for page in range(pages):
+        parts.append(f"## Checklist {page}\n")
+        parts.extend(items(0, ordered=page % 2 == 1))
+        parts.append("")
+    return "\n".join(parts)
+
+
+def simple_markdown(pages):
+    """The bullets / numbers / paragraphs subset that add_markdown_content_to_doc handles."""
+    parts = []
+    for page in range(pages):
+        for i in range(4):
+            parts.append(PARAGRAPH.format(i=i) * 2)
+        parts.extend(f"* Bullet {i} with **bold** text" for i in range(6))
+        parts.extend(f"{i}. Numbered step {i}" for i in range(1, 6))
+    return "\n".join(parts)
+
+
+def drs_docx(pages):
+    """A .docx DRS (headings, paragraphs, lists, tables), built via TokenMarkdownToDocx."""
+    from docx_reader.md_token_converter import TokenMarkdownToDocx
+
+    document = TokenMarkdownToDocx().convert(strategy_markdown(pages))
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def drs_text(pages):
+    return strategy_markdown(pages).encode("utf-8")
+
+
+REQUIREMENT_TOPICS = {
+    "Performance": "latency throughput response time load peak concurrent users transactions per second",
+    "Security": "authentication authorisation encryption password token audit intrusion vulnerability",
+    "Data Migration": "migration legacy records mapping reconciliation cutover rollback extract",
+    "Reporting": "report dashboard export chart schedule filter aggregate summary",
+    "Integration": "interface api message queue partner endpoint payload retry contract",
+    "Availability": "uptime failover disaster recovery backup redundancy maintenance window",
+    "Usability": "accessibility screen reader keyboard navigation layout localisation help",
+    "Compliance": "regulation retention privacy consent gdpr record keeping evidence",
+}
+
+
+def requirements_text(pages):
+    """
+    A DRS as extract_text returns it: numbered topic sections (one topic per
+    page, cycling through REQUIREMENT_TOPICS), each with sub-sections of
+    'The system shall ...' requirements using that topic's vocabulary.
+    """
+    topics = list(REQUIREMENT_TOPICS)
+    lines = []
+    for page in range(pages):
+        topic = topics[page % len(topics)]
+        words = REQUIREMENT_TOPICS[topic].split()
+        lines.append(f"{page + 1} {topic} Requirements")
+        for sub in range(3):
+            lines.append(f"{page + 1}.{sub + 1} {topic} {words[sub]} rules")
+            for i in range(6):
+                a, b = words[(sub + i) % len(words)], words[(sub + 2 * i + 1) % len(words)]
+                lines.append(f"REQ-{page}-{sub}-{i}: The system shall support {a} and {b} for every "
+                             f"business unit, as agreed with the owners of the {topic.lower()} process.")
+    return "\n".join(lines)
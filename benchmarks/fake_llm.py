@@ -0,0 +1,66 @@
+"""
+LLM stand-in for the generation benchmarks: answers the outline prompt with
+a fixed list of sections and streams every section as `tokens` chunks of
+`token_text`, `latency` seconds apart (sync and asyncio variants). The
+outline takes `latency` per list element, invoked or streamed (one
+element per chunk).
+"""
+import asyncio
+import json
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+class FakeChat:
+    model_id = 'fake'
+    model_kwargs = {}
+
+    def __init__(self, sections, tokens=20, latency=0.0, token_text="token "):
+        self.sections = sections
+        self.tokens = tokens
+        self.latency = latency
+        self.token_text = token_text
+
+    def _outline(self):
+        return AIMessage(content=json.dumps(self.sections))
+
+    @staticmethod
+    def _is_outline(messages):
+        return len(messages) == 1 and messages[0].content.startswith("Analyze this Sample Strategy")
+
+    def _outline_chunks(self):
+        elements = [json.dumps(section) for section in self.sections]
+        return ["[" + ", ".join(elements[:1])] + [", " + e for e in elements[1:]] + ["]"]
+
+    def _invoke_latency(self, messages):
+        return self.latency * (len(self._outline_chunks()) if self._is_outline(messages) else 1)
+
+    def invoke(self, messages):
+        time.sleep(self._invoke_latency(messages))
+        return self._outline()
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self._invoke_latency(messages))
+        return self._outline()
+
+    def stream(self, messages):
+        if self._is_outline(messages):
+            for text in self._outline_chunks():
+                time.sleep(self.latency)
+                yield AIMessageChunk(content=text)
+            return
+        for _ in range(self.tokens):
+            if self.latency:
+                time.sleep(self.latency)
+            yield AIMessageChunk(content=self.token_text)
+
+    async def astream(self, messages):
+        if self._is_outline(messages):
+            for text in self._outline_chunks():
+                await asyncio.sleep(self.latency)
+                yield AIMessageChunk(content=text)
+            return
+        for _ in range(self.tokens):
+            await asyncio.sleep(self.latency)
+            yield AIMessageChunk(content=self.token_text)
@@ -0,0 +1,269 @@
+"""
+Benchmark suite for the converter, extraction and generation hot paths,
+compared against a stored baseline (benchmarks/baseline.json).
+
+Every case runs in a fresh subprocess on synthetic corpora (corpus.py) and
+reports throughput (pages/s), peak RSS, peak traced allocation size and the
+number of allocated blocks still live afterwards (CPython keeps no running
+total of allocations, so tracemalloc's peak and retained blocks stand in).
+Table-heavy and nested-list input runs through both converters: the HTML
+path (MarkdownToDocx._process_table / _process_list, md_html_*) and the
+token path (TokenMarkdownToDocx, md_tables / md_nested_lists).
+
+    python benchmarks/run_suite.py                       # compare with baseline
+    python benchmarks/run_suite.py --full                # include 1,000-page corpora
+    python benchmarks/run_suite.py --case md_token --pages 1 100
+    python benchmarks/run_suite.py --save-baseline       # after an intended change
+
+Exits non-zero when a case is slower, or uses more memory, than the baseline
+by more than --tolerance. Baselines are machine specific; re-record them on
+the machine that runs the comparison.
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+DEFAULT_PAGES = [1, 10, 100]
+FULL_PAGES = [1, 10, 100, 1000]
+
+
+# --- Cases: each takes (pages, args), builds its input, returns a no-arg callable ---
+def _upload(data, name):
+    upload = io.BytesIO(data)
+    upload.name = name
+    return upload
+
+
+def case_md_token(pages, args):
+    from corpus import strategy_markdown
+    from docx_reader.md_token_converter import TokenMarkdownToDocx
+    text = strategy_markdown(pages)
+    return lambda: TokenMarkdownToDocx().convert(text)
+
+
+def case_md_html(pages, args):
+    from corpus import strategy_markdown
+    from docx_reader.mdtodoc import MarkdownToDocx
+    text = strategy_markdown(pages)
+    return lambda: MarkdownToDocx().convert(text)
+
+
+def case_md_tables(pages, args):
+    from corpus import table_heavy_markdown
+    from docx_reader.md_token_converter import TokenMarkdownToDocx
+    text = table_heavy_markdown(pages)
+    return lambda: TokenMarkdownToDocx().convert(text)
+
+
+def case_md_nested_lists(pages, args):
+    from corpus import nested_list_markdown
+    from docx_reader.md_token_converter import TokenMarkdownToDocx
+    text = nested_list_markdown(pages)
+    return lambda: TokenMarkdownToDocx().convert(text)
+
+
+def case_md_html_tables(pages, args):
+    from corpus import table_heavy_markdown
+    from docx_reader.mdtodoc import MarkdownToDocx
+    text = table_heavy_markdown(pages)
+    return lambda: MarkdownToDocx().convert(text)
+
+
+def case_md_html_nested_lists(pages, args):
+    from corpus import nested_list_markdown
+    from docx_reader.mdtodoc import MarkdownToDocx
+    text = nested_list_markdown(pages)
+    return lambda: MarkdownToDocx().convert(text)
+
+
+def case_add_markdown_content(pages, args):
+    from docx import Document
+    from corpus import simple_markdown
+    from docx_reader.mdtodocxupdated import add_markdown_content_to_doc
+    text = simple_markdown(pages)
+    return lambda: add_markdown_content_to_doc(Document(), text)
+
+
+def case_extract_docx(pages, args):
+    from corpus import drs_docx
+    from docx_reader.text_extraction import extract_text
+    data = drs_docx(pages)
+    return lambda: extract_text(_upload(data, 'drs.docx'))
+
+
+def case_extract_text(pages, args):
+    from corpus import drs_text
+    from docx_reader.text_extraction import extract_text
+    data = drs_text(pages)
+    return lambda: extract_text(_upload(data, 'drs.md'))
+
+
+def case_content_blocks(pages, args):
+    import docx
+    from corpus import drs_docx
+    from docx_reader.docx_blocks import extract_content_blocks
+    data = drs_docx(pages)
+    return lambda: extract_content_blocks(docx.Document(io.BytesIO(data)))
+
+
+def case_generate(pages, args):
+    """Structured generator end to end, one section per page, against the LLM stand-in."""
+    from fake_llm import FakeChat
+    import docx_reader.bedrock_client as bedrock_client
+    import docx_reader.generatejsonforteststrategy as strategy
+    sections = [{"title": f"Section {i}", "level": 1 + i % 3} for i in range(pages)]
+    chat = FakeChat(sections, tokens=args.llm_tokens, latency=args.llm_latency)
+    bedrock_client.get_chat = lambda: chat
+    runs = iter(range(10 ** 9))
+
+    def run():
+        # A new sample strategy each time, so the outline call is not skipped
+        for _ in strategy.stream_strategy_generator('drs', f'sample {next(runs)}', 'target', use_cache=False):
+            pass
+    return run
+
+
+CASES = {
+    'md_token': case_md_token,
+    'md_html': case_md_html,
+    'md_tables': case_md_tables,
+    'md_nested_lists': case_md_nested_lists,
+    'md_html_tables': case_md_html_tables,
+    'md_html_nested_lists': case_md_html_nested_lists,
+    'add_markdown_content': case_add_markdown_content,
+    'extract_docx': case_extract_docx,
+    'extract_text': case_extract_text,
+    'content_blocks': case_content_blocks,
+    'generate': case_generate,
+}
+
+
+# --- Child: run one case and print its numbers as JSON ---
+def _setup_child():
+    tmp = tempfile.mkdtemp(prefix='bench_suite_')
+    os.environ['ARTIFACT_DIR'] = os.path.join(tmp, 'artifacts')
+    os.environ['OUTLINE_STORE_PATH'] = os.path.join(tmp, 'outline.sqlite3')
+    os.environ['LLM_CACHE_PATH'] = os.path.join(tmp, 'llm_cache.sqlite3')
+    from django.conf import settings
+    settings.configure(ROOT_URLCONF='docx_reader.artifact_store')
+    import django
+    django.setup()
+    import _app  # noqa: F401  (registers the docx_reader package)
+    import logging
+    logging.getLogger('docx_reader').setLevel(logging.WARNING)
+
+
+def run_child(case, pages, args):
+    _setup_child()
+    run = CASES[case](pages, args)
+    run()  # warm-up: imports, style caches, SQLite files
+
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = len(tracemalloc.take_snapshot().traces)
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    retained = len(tracemalloc.take_snapshot().traces) - before
+    tracemalloc.stop()
+
+    seconds = min(times)
+    return {
+        'case': case,
+        'pages': pages,
+        'seconds': round(seconds, 5),
+        'pages_per_s': round(pages / seconds, 2),
+        'peak_rss_mib': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'peak_alloc_mib': round(peak / 2 ** 20, 2),
+        'retained_blocks': retained,
+    }
+
+
+# --- Parent: spawn the cases, compare with the baseline ---
+def run_case(case, pages, args):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', case, str(pages),
+           '--repeat', str(args.repeat), '--llm-latency', str(args.llm_latency),
+           '--llm-tokens', str(args.llm_tokens)]
+    out = subprocess.run(cmd, cwd=HERE, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def compare(result, base, tolerance):
+    """Returns the list of regressions of result against its baseline entry."""
+    problems = []
+    if base is None:
+        return problems
+    if result['pages_per_s'] < base['pages_per_s'] * (1 - tolerance):
+        problems.append(f"throughput {result['pages_per_s']} < {base['pages_per_s']} pages/s")
+    for key in ('peak_rss_mib', 'peak_alloc_mib'):
+        # Small absolute differences are noise, not regressions
+        if result[key] > base[key] * (1 + tolerance) and result[key] - base[key] > 1:
+            problems.append(f"{key} {result[key]} > {base[key]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--case', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--pages', type=int, nargs='+')
+    parser.add_argument('--full', action='store_true', help='include the 1,000-page corpora')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='seconds per streamed token')
+    parser.add_argument('--llm-tokens', type=int, default=20, help='tokens per generated section')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--child', nargs=2, metavar=('CASE', 'PAGES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], int(args.child[1]), args)))
+        return 0
+
+    pages_list = args.pages or (FULL_PAGES if args.full else DEFAULT_PAGES)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    failures = 0
+    print(f"{'case':22} {'pages':>5} {'pages/s':>10} {'vs base':>8} {'RSS MiB':>8} {'alloc MiB':>9} {'retained':>9}")
+    for case in args.case:
+        for pages in pages_list:
+            result = run_case(case, pages, args)
+            key = f"{case}@{pages}"
+            results[key] = result
+            base = baseline.get(key)
+            delta = f"{result['pages_per_s'] / base['pages_per_s'] - 1:+.0%}" if base else "new"
+            print(f"{case:22} {pages:5} {result['pages_per_s']:10.1f} {delta:>8} "
+                  f"{result['peak_rss_mib']:8.1f} {result['peak_alloc_mib']:9.2f} {result['retained_blocks']:9}")
+            for problem in compare(result, base, args.tolerance):
+                failures += 1
+                print(f"    REGRESSION {key}: {problem}")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
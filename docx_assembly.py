@@ -0,0 +1,46 @@
+import concurrent.futures
+
+
+class DocxAssembler:
+    """
+    Builds one .docx a section at a time on a background thread, so a
+    section's conversion overlaps with the model call for the next one.
+    By the last section only that section's conversion is left, and
+    save() just waits for it and writes the file.
+
+        assembler = DocxAssembler(write_section, document)
+        for ...:
+            assembler.add(title, content)   # returns immediately
+        assembler.save(path)
+
+    write_section(document, *args) runs on the assembly thread, one call at
+    a time and in add() order; nothing else may touch the document until
+    save() / wait() returns. Its first exception is raised from save().
+    """
+
+    def __init__(self, write_section, document):
+        self.document = document
+        self._write_section = write_section
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="docx-assembly")
+        self._pending = []
+
+    def add(self, *args):
+        self._pending.append(self._executor.submit(self._write_section, self.document, *args))
+        # Keep only the futures that can still fail
+        self._pending = [f for f in self._pending if not f.done() or f.exception() is not None]
+
+    def wait(self):
+        """Blocks until every added section is in the document; returns it."""
+        try:
+            for future in self._pending:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        return self.document
+
+    def save(self, path_or_stream):
+        self.wait().save(path_or_stream)
+
+    def close(self):
+        """Drops pending sections (the run was abandoned)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+from docx.oxml.ns import qn
+from docx.styles import BabelFish
+from lxml import etree
+
+# Precompiled XPath: the runs python-docx counts towards Paragraph.text
+_NSMAP = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+_runs = etree.XPath('./w:r | ./w:hyperlink/w:r', namespaces=_NSMAP)
+
+_P = qn('w:p')
+_TBL = qn('w:tbl')
+_TR = qn('w:tr')
+_TC = qn('w:tc')
+_T = qn('w:t')
+_TAB = qn('w:tab')
+_PTAB = qn('w:ptab')
+_BR = qn('w:br')
+_CR = qn('w:cr')
+_NO_BREAK_HYPHEN = qn('w:noBreakHyphen')
+_TYPE = qn('w:type')
+_VAL = qn('w:val')
+_PPR = qn('w:pPr')
+_PSTYLE = qn('w:pStyle')
+_TCPR = qn('w:tcPr')
+_GRIDSPAN = qn('w:gridSpan')
+_VMERGE = qn('w:vMerge')
+
+
+def build_heading_map(doc):
+    """
+    Resolves every paragraph style ONCE to a heading level (or None),
+    using the same rule as the old loop: names starting with 'Heading'
+    take the trailing number, falling back to level 2.
+    Returns (levels by styleId, level of the default paragraph style).
+    """
+    levels = {}
+    default_level = None
+    for style in doc.styles.element.iterchildren(qn('w:style')):
+        if style.get(qn('w:type')) != 'paragraph':
+            continue
+        name_el = style.find(qn('w:name'))
+        name = BabelFish.internal2ui(name_el.get(_VAL)) if name_el is not None else ''
+        level = None
+        if name.startswith('Heading'):
+            try:
+                level = int(name.split()[-1])
+            except ValueError:
+                level = 2
+        levels[style.get(qn('w:styleId'))] = level
+        if style.get(qn('w:default')) in ('1', 'true', 'on'):
+            default_level = level
+    return levels, default_level
+
+
+def _paragraph_text(p):
+    parts = []
+    for run in _runs(p):
+        for child in run:
+            tag = child.tag
+            if tag == _T:
+                parts.append(child.text or '')
+            elif tag in (_TAB, _PTAB):
+                parts.append('\t')
+            elif tag == _BR:
+                if child.get(_TYPE) in (None, 'textWrapping'):
+                    parts.append('\n')
+            elif tag == _CR:
+                parts.append('\n')
+            elif tag == _NO_BREAK_HYPHEN:
+                parts.append('-')
+    return ''.join(parts)
+
+
+def _table_rows(tbl):
+    """
+    Cell text per grid column, like python-docx row.cells: a gridSpan cell
+    repeats across its columns and a vMerge continuation repeats the cell above.
+    """
+    above = {}
+    for tr in tbl.iterchildren(_TR):
+        row = []
+        for tc in tr.iterchildren(_TC):
+            span = 1
+            continued = False
+            tc_pr = tc.find(_TCPR)
+            if tc_pr is not None:
+                grid_span = tc_pr.find(_GRIDSPAN)
+                if grid_span is not None:
+                    span = int(grid_span.get(_VAL, 1))
+                v_merge = tc_pr.find(_VMERGE)
+                continued = v_merge is not None and v_merge.get(_VAL, 'continue') == 'continue'
+
+            col = len(row)
+            if continued and col in above:
+                text = above[col]
+            else:
+                text = '\n'.join(_paragraph_text(p) for p in tc.iterchildren(_P)).strip()
+            for _ in range(span):
+                above[len(row)] = text
+                row.append(text)
+        yield row
+
+
+def iter_content_blocks(doc):
+    """
+    Walks doc.element.body on the raw XML and yields the same blocks as the
+    old Paragraph/Table loop in process_docx:
+        {'type': 'heading', 'content': text, 'level': n}
+        {'type': 'text', 'content': text}
+        {'type': 'table', 'content': [[cell, ...], ...]}
+    """
+    levels, default_level = build_heading_map(doc)
+    for element in doc.element.body.iterchildren():
+        tag = element.tag
+        if tag == _P:
+            text = _paragraph_text(element).strip()
+            if not text:
+                continue
+            level = default_level
+            p_pr = element.find(_PPR)
+            if p_pr is not None:
+                p_style = p_pr.find(_PSTYLE)
+                if p_style is not None:
+                    # Unknown style ids fall back to the default style, as in python-docx
+                    level = levels.get(p_style.get(_VAL), default_level)
+            if level is not None:
+                yield {'type': 'heading', 'content': text, 'level': level}
+            else:
+                yield {'type': 'text', 'content': text}
+
+        elif tag == _TBL:
+            yield {'type': 'table', 'content': list(_table_rows(element))}
+
+
+def extract_content_blocks(doc):
+    return list(iter_content_blocks(doc))
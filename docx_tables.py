@@ -0,0 +1,56 @@
+from docx.oxml.ns import qn
+from lxml import etree
+
+_TR = qn('w:tr')
+_TC = qn('w:tc')
+_P = qn('w:p')
+_R = qn('w:r')
+_RPR = qn('w:rPr')
+_B = qn('w:b')
+_T = qn('w:t')
+_XML_SPACE = qn('xml:space')
+
+
+def _write_cell(tc, text, bold):
+    """Writes text into the cell's (single, empty) paragraph as one run, as cell.text does."""
+    p = tc.find(_P)
+    r = etree.SubElement(p, _R)
+    if bold:
+        etree.SubElement(etree.SubElement(r, _RPR), _B)
+    if not text:
+        return
+    if '\t' in text or '\n' in text:
+        # Tabs / line breaks need w:tab / w:br children; let python-docx do those
+        r.text = text
+        return
+    t = etree.SubElement(r, _T)
+    t.text = text
+    if text[:1].isspace() or text[-1:].isspace():
+        t.set(_XML_SPACE, 'preserve')
+
+
+def add_table_bulk(document, rows, header_rows=None, style='Table Grid'):
+    """
+    Adds a table of plain-text cells to the document in one pass.
+
+    rows is a list of rows, each a list of cell strings; the first row sets
+    the column count and extra cells are dropped (prevention against
+    malformed tables). header_rows[i] = True makes row i bold.
+
+    Unlike table.cell(i, j) + cell.text per cell, which re-walks the grid on
+    every call and makes big tables quadratic, this walks the w:tr / w:tc
+    elements once and writes each cell's run directly.
+    """
+    if not rows:
+        return None
+
+    num_cols = len(rows[0])
+    table = document.add_table(rows=len(rows), cols=num_cols)
+    if style:
+        table.style = style
+
+    header_rows = header_rows or [False] * len(rows)
+    for tr, values, is_header in zip(table._tbl.iterchildren(_TR), rows, header_rows):
+        for tc, text in zip(tr.iterchildren(_TC), values):
+            _write_cell(tc, text, is_header)
+    return table
@@ -0,0 +1,137 @@
+import copy
+import os
+import threading
+
+import docx
+from docx.opc.part import XmlPart
+
+# Front-matter fragments (cover page, TOC, ...) kept per template; the oldest
+# title is dropped beyond this.
+MAX_FRONT_MATTER = 32
+
+# Part attributes that survive a clone. Everything else in a part's __dict__
+# is a lazily built cache (rels, wrappers) that must be rebuilt per copy.
+_PART_STATE = ('_partname', '_content_type', '_blob', '_image')
+
+
+class _Template:
+    """A parsed template package that is never modified, only cloned."""
+
+    def __init__(self, stamp, document):
+        self.stamp = stamp
+        self.document = document
+        self.front_matter = {}
+        self.lock = threading.Lock()
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+# --- 1. Package cloning ---
+def _clone_package(package):
+    """
+    Copy of an opened package: XML parts get a deep copy of their element
+    (a C-level lxml copy, no zip or XML parsing); binary parts (images,
+    theme, fonts) share their bytes, which python-docx never changes.
+    """
+    new_package = object.__new__(type(package))
+    parts = {}
+    for part in package.iter_parts():
+        new_part = object.__new__(type(part))
+        new_part.__dict__.update((k, v) for k, v in part.__dict__.items() if k in _PART_STATE)
+        new_part._package = new_package
+        if isinstance(part, XmlPart):
+            new_part._element = copy.deepcopy(part._element)
+        parts[part] = new_part
+
+    def relink(source, target):
+        for rel in source.rels.values():
+            to = rel.target_ref if rel.is_external else parts[rel.target_part]
+            target.rels.add_relationship(rel.reltype, to, rel.rId, rel.is_external)
+
+    relink(package, new_package)
+    for part, new_part in parts.items():
+        relink(part, new_part)
+    # As after loading: registers the existing images, so a new picture
+    # gets the next free image name instead of a duplicate one
+    new_package.after_unmarshal()
+    return new_package
+
+
+def _clone(document):
+    return _clone_package(document.part.package).main_document_part.document
+
+
+# --- 2. Template cache ---
+def _stamp(template_path):
+    if template_path is None:
+        return None
+    st = os.stat(template_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _get_template(template_path):
+    """Cached parsed template, re-read when the file's mtime or size changes."""
+    key = os.path.abspath(template_path) if template_path else None
+    stamp = _stamp(template_path)
+    entry = _templates.get(key)
+    if entry is None or entry.stamp != stamp:
+        with _templates_lock:
+            entry = _templates.get(key)
+            if entry is None or entry.stamp != stamp:
+                entry = _Template(stamp, docx.Document(template_path))
+                _templates[key] = entry
+    return entry
+
+
+def load_template(template_path=None):
+    """
+    Fresh Document for template_path (python-docx's default template when
+    None). Equivalent to docx.Document(template_path), without re-reading
+    and re-parsing the file on every call.
+    """
+    return _clone(_get_template(template_path).document)
+
+
+def clear_templates():
+    with _templates_lock:
+        _templates.clear()
+
+
+# --- 3. Cached front matter ---
+def append_front_matter(document, template_path, key, build):
+    """
+    Appends the body content build(scratch_document) writes to a blank copy
+    of the template, built once per (template, key) and copied afterwards.
+    key must identify everything build depends on (title, builder class);
+    build may only add body content, not parts such as images.
+    """
+    entry = _get_template(template_path)
+    fragment = entry.front_matter.get(key)
+    if fragment is None:
+        with entry.lock:
+            fragment = entry.front_matter.get(key)
+            if fragment is None:
+                fragment = _build_fragment(entry.document, build)
+                if len(entry.front_matter) >= MAX_FRONT_MATTER:
+                    entry.front_matter.pop(next(iter(entry.front_matter)))
+                entry.front_matter[key] = fragment
+
+    body = document.element.body
+    sect_pr = body.sectPr
+    for element in fragment:
+        element = copy.deepcopy(element)
+        if sect_pr is not None:
+            sect_pr.addprevious(element)
+        else:
+            body.append(element)
+
+
+def _build_fragment(prototype, build):
+    scratch = _clone(prototype)
+    body = scratch.element.body
+    # python-docx inserts new body content before the trailing w:sectPr
+    start = len(body) - 1 if body.sectPr is not None else len(body)
+    build(scratch)
+    return [el for el in body[start:] if el is not body.sectPr]
@@ -1,18 +1,15 @@
-import io
-import base64
+from django.urls import reverse
+from .artifact_store import purge_expired, save_document
+from .docx_assembly import DocxAssembler
 # ... existing imports (json, re, docx, boto3, etc)
 
 
-def generate_docx_base64(content_text):
-    # 1. Create the Document in memory
-    doc = docx.Document()
-    doc.add_heading('Generated Test Strategy', 0)
-
-    # Simple parsing to formatting
+def add_markdown_lines(doc, content_text):
+    """Simple parsing to formatting: '## ' / '### ' headings, other lines as paragraphs."""
     for line in content_text.split('\n'):
         line = line.strip()
         if not line: continue
-        
+
         if line.startswith('## '):
             doc.add_heading(line.replace('## ', ''), level=1)
         elif line.startswith('### '):
@@ -21,45 +18,81 @@ def generate_docx_base64(content_text):
             doc.add_paragraph(line)
 
 
+def new_strategy_document():
+    doc = docx.Document()
+    doc.add_heading('Generated Test Strategy', 0)
+    return doc
+
+
+def generate_docx_file(content_text):
+    """
+    Builds the DOCX on the server and stores it under a short-lived token.
+    Returns the token; download_artifact (artifact_store.py) streams the
+    file back in chunks, so nothing is base64-encoded into the page.
+    """
+    # 1. Create the Document
+    doc = new_strategy_document()
+    add_markdown_lines(doc, content_text)
+
+    # 2. Save straight to the artifact store (no BytesIO / base64 copies)
+    purge_expired()
+    return save_document(doc, "Generated_Strategy.docx")
+
+
+def start_docx_file():
+    """
+    Incremental generate_docx_file: add() each section's markdown as it
+    arrives (it is converted in the background while the next section is
+    generated), then finish_docx_file() for the token.
+    """
+    purge_expired()
+    return DocxAssembler(add_markdown_lines, new_strategy_document())
+
+
+def finish_docx_file(assembler):
+    return save_document(assembler.wait(), "Generated_Strategy.docx")
+
+
 
 def stream_strategy_generator(sample_drs, sample_strat, target_drs):
     # ... [Keep Setup, Headers, and Outline logic exactly the same] ...
 
-    # ... [Keep the "for section in sections" loop exactly the same] ...
+    # Before the loop: the DOCX is built while the sections are generated
+    docx_file = start_docx_file()
+
+    # ... [Keep the "for section in sections" loop exactly the same, and
+    #      after each full_document.append(section_md) add:]
+    #         docx_file.add(section_md)
+    # Separate sections' lines are parsed independently, so this gives the
+    # same document as converting "\n\n".join(full_document) at the end.
 
     # --- FINAL BLOCK ---
-    
-    # 1. Combine all text
-    final_md_text = "\n\n".join(full_document)
 
     yield '<div class="status-update">Finalizing document format...</div>'
 
-    # 2. Generate the Base64 DOCX string (Happens on server)
+    # 1 + 2. Only the last section can still be converting; store the DOCX on the server
     try:
-        b64_string = generate_docx_base64(final_md_text)
-        
-        # 3. Create the Data URI
-        # This tells the browser: "The file data is right here in this string"
-        mime_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        data_uri = f"data:{mime_type};base64,{b64_string}"
+        token = finish_docx_file(docx_file)
+
+        # 3. Short-lived download link served by the download view
+        download_url = reverse('download_artifact', args=[token])
 
         yield '<div class="status-success">Generation Complete!</div>'
 
         # 4. Inject the Download Button
-        # We set the 'href' to the data URI and 'download' to the filename
+        # The 'href' is only a small link; the file itself is streamed on click
         yield f"""
         <script>
             var btn = document.getElementById('download-btn');
-            btn.href = "{data_uri}";
-            btn.download = "Generated_Strategy.docx";
+            btn.href = "{download_url}";
             btn.onclick = null; // Remove the old onclick if it existed
             btn.style.display = "inline-block";
             btn.innerText = "Download DOCX Now";
-            
+
             window.scrollTo(0, document.body.scrollHeight);
         </script>
         """
-        
+
     except Exception as e:
         yield f'<div class="error-box">Error creating DOCX: {str(e)}</div>'
 
@@ -67,23 +100,9 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
 
 
 
-# New
-yield """
+# New: yield this in the HTML header in place of the old download button
+DOWNLOAD_BUTTON_HTML = """
 <a id="download-btn" style="display:none; background: #6200ea; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; margin-top: 20px; cursor: pointer;">
     Processing file...
 </a>
 """
-
-    # 2. Save to BytesIO buffer
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-
-    # 3. Encode to Base64
-    # We read the bytes, encode them to base64, then decode to a UTF-8 string
-    encoded_file = base64.b64encode(buffer.read()).decode('utf-8')
-    
-    return encoded_file
-
-
-
@@ -0,0 +1,273 @@
+import collections
+import hashlib
+import re
+import threading
+import time
+
+import numpy as np
+
+# Send each section only the DRS passages relevant to it, instead of the
+# whole requirement text in every prompt.
+DRS_RETRIEVAL = True
+
+# Below this many characters the whole DRS still goes into the shared
+# (prompt-cached) prefix; retrieval only pays off on large documents.
+DRS_RETRIEVAL_MIN_CHARS = 32_000
+
+CHUNK_CHARS = 1500           # target chunk size; chunks never span a heading
+
+# Chunks per section prompt: the best-scoring ones until they carry this
+# share of the section's total match score over the whole DRS, within a
+# per-section budget of excerpt characters (~4 chars per token).
+RETRIEVAL_RECALL = 0.8
+RETRIEVAL_MAX_CHARS = 48_000
+FALLBACK_CHUNKS = 8          # opening chunks sent when nothing matches the title
+
+# Indexes of recent DRS texts, keyed by a hash of the text and bounded by
+# the total size of the texts they were built from.
+INDEX_CACHE_CHARS = 40_000_000
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MD_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*$")
+_NUMBERED_HEADING_RE = re.compile(r"^(\d+(?:\.\d+)*)\.?\s+([A-Za-z].*)$")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or shall "
+    "should that the this to was were will with which must may can not all any".split()
+)
+
+
+# --- 1. Chunking ---
+class Chunk:
+    """A run of DRS text under one heading; heading is the full path ('3 Performance > 3.2 Latency')."""
+
+    __slots__ = ("heading", "text")
+
+    def __init__(self, heading, text):
+        self.heading = heading
+        self.text = text
+
+    def render(self):
+        return f"[{self.heading}]\n{self.text}" if self.heading else self.text
+
+
+def _heading(line):
+    """(level, title) if the line looks like a heading, else None."""
+    if len(line) > 120:
+        return None
+    match = _MD_HEADING_RE.match(line)
+    if match:
+        return len(match.group(1)), match.group(2)
+    match = _NUMBERED_HEADING_RE.match(line)
+    # "3.2 Latency" is a heading; "1. The system shall ..." is a list item
+    if match and not line.endswith((".", ":", ";", ",")) and len(line.split()) <= 12:
+        return match.group(1).count(".") + 1, line
+    if line.isupper() and len(line.split()) <= 8 and any(c.isalpha() for c in line):
+        return 1, line
+    return None
+
+
+def split_chunks(text, chunk_chars=CHUNK_CHARS):
+    """
+    Splits DRS text (as extract_text returns it) into chunks of about
+    chunk_chars, breaking at paragraph boundaries and never across a
+    heading. Headings are recognised from markdown '#', section numbering
+    ('3.2 Latency') and short upper-case lines.
+    """
+    chunks = []
+    path = []          # [(level, title)] of the enclosing headings
+    lines, size = [], 0
+
+    def flush():
+        nonlocal lines, size
+        body = "\n".join(lines).strip()
+        if body:
+            chunks.append(Chunk(" > ".join(title for _, title in path), body))
+        lines, size = [], 0
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = _heading(stripped) if stripped else None
+        if heading is not None:
+            flush()
+            level = heading[0]
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append(heading)
+            continue
+        # Very long paragraphs are cut as well, so no chunk grows unbounded
+        while len(stripped) > chunk_chars:
+            flush()
+            lines, size = [stripped[:chunk_chars]], chunk_chars
+            stripped = stripped[chunk_chars:]
+        if size + len(stripped) > chunk_chars and lines:
+            flush()
+        lines.append(stripped)
+        size += len(stripped) + 1
+    flush()
+    return chunks
+
+
+def tokenize(text):
+    words = _WORD_RE.findall(text.lower())
+    # Light plural folding so "risks" matches "risk"
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+            for w in words if w not in _STOPWORDS]
+
+
+# --- 2. BM25 Index ---
+class DrsIndex:
+    """
+    In-process BM25 index over the chunks of one DRS. Postings are NumPy
+    arrays sorted by term, so a query is a handful of vectorised adds.
+    Read-only once built; safe to share between section threads.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.chars = sum(len(chunk.text) for chunk in chunks)
+        self._sizes = np.array([len(chunk.render()) for chunk in chunks], dtype=np.int64)
+        self.vocab = {}
+        term_ids, doc_ids, tfs = [], [], []
+        lengths = np.zeros(len(chunks), dtype=np.float32)
+        for doc, chunk in enumerate(chunks):
+            # The heading path is indexed with the text: it names the topic
+            words = tokenize(f"{chunk.heading}\n{chunk.text}")
+            lengths[doc] = len(words)
+            counts = {}
+            for word in words:
+                term = self.vocab.setdefault(word, len(self.vocab))
+                counts[term] = counts.get(term, 0) + 1
+            term_ids.extend(counts)
+            doc_ids.extend([doc] * len(counts))
+            tfs.extend(counts.values())
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        tf = np.asarray(tfs, dtype=np.float32)[order]
+        self._offsets = np.searchsorted(term_ids[order], np.arange(len(self.vocab) + 1))
+
+        n = max(len(chunks), 1)
+        df = np.diff(self._offsets).astype(np.float32)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        avgdl = float(lengths.mean()) if len(chunks) else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[self._doc_ids] / max(avgdl, 1.0))
+        # Per-posting BM25 weight, so scoring is only gathers and adds
+        self._weights = np.repeat(idf, np.diff(self._offsets)) * tf * (BM25_K1 + 1) / (tf + norm)
+
+    @classmethod
+    def from_text(cls, text, chunk_chars=CHUNK_CHARS):
+        return cls(split_chunks(text, chunk_chars))
+
+    def scores(self, query):
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for word in set(tokenize(query)):
+            term = self.vocab.get(word)
+            if term is None:
+                continue
+            start, end = self._offsets[term], self._offsets[term + 1]
+            # Each chunk appears at most once per term, so plain fancy-index add is safe
+            scores[self._doc_ids[start:end]] += self._weights[start:end]
+        return scores
+
+    def search(self, query, recall=RETRIEVAL_RECALL, max_chars=RETRIEVAL_MAX_CHARS):
+        """
+        Returns (chunk indexes in document order, recall). Takes chunks in
+        score order until they carry `recall` of the query's total score
+        over the whole DRS or the next one would pass max_chars of
+        excerpts; the returned recall is the share actually reached (1.0:
+        nothing that matched was left out).
+        """
+        scores = self.scores(query)
+        total = float(scores.sum())
+        if total <= 0:
+            # No term matched (e.g. "Appendix"): fall back to the opening chunks
+            return self._within(range(min(FALLBACK_CHUNKS, len(self.chunks))), max_chars), 0.0
+        matched = np.flatnonzero(scores)
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        # Chunks needed for the score target, then trimmed to the budget
+        mass = np.cumsum(scores[order])
+        needed = int(np.searchsorted(mass, recall * total - 1e-9)) + 1
+        ids = self._within(order[:needed], max_chars)
+        return sorted(ids), float(scores[ids].sum()) / total
+
+    def _within(self, ids, max_chars):
+        """The leading ids whose rendered chunks fit in max_chars (at least one)."""
+        sizes = np.cumsum(self._sizes[list(ids)] + 2)  # +2: the blank line between excerpts
+        return [int(i) for i in list(ids)[:max(1, int(np.searchsorted(sizes, max_chars, side="right")))]]
+
+    def excerpts(self, ids):
+        return "\n\n".join(self.chunks[i].render() for i in ids)
+
+
+_indexes = collections.OrderedDict()   # text hash -> DrsIndex, least recently used first
+_indexes_chars = 0
+_indexes_lock = threading.Lock()
+
+
+def _text_key(text):
+    digest = hashlib.sha256()
+    for start in range(0, len(text), 1 << 20):
+        digest.update(text[start:start + (1 << 20)].encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def get_drs_index(text):
+    """Index for a DRS text, built once per distinct text (re-runs on the same upload reuse it)."""
+    global _indexes_chars
+    key = _text_key(text)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = DrsIndex.from_text(text)
+    if index.chars > INDEX_CACHE_CHARS:
+        return index
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = index
+            _indexes_chars += index.chars
+            while _indexes_chars > INDEX_CACHE_CHARS:
+                _, dropped = _indexes.popitem(last=False)
+                _indexes_chars -= dropped.chars
+    return index
+
+
+# --- 3. Per-Section Requirement Context ---
+class RequirementContext:
+    """
+    Decides, once per request, how the DRS reaches the section prompts:
+    small documents go whole into the shared prefix (shared_text), large
+    ones through the index, the best-matching chunks per section (for_section).
+    """
+
+    def __init__(self, target_drs, recall=RETRIEVAL_RECALL, max_chars=RETRIEVAL_MAX_CHARS,
+                 min_chars=DRS_RETRIEVAL_MIN_CHARS, enabled=DRS_RETRIEVAL):
+        self.target_drs = target_drs
+        self.recall = recall
+        self.max_chars = max_chars
+        self.index = get_drs_index(target_drs) if enabled and len(target_drs) > min_chars else None
+
+    @property
+    def shared_text(self):
+        """DRS text for the shared prefix, or None when sections get excerpts instead."""
+        return self.target_drs if self.index is None else None
+
+    def for_section(self, title, metrics=None):
+        """Excerpts for one section prompt (None without an index); recall is recorded on metrics."""
+        if self.index is None:
+            return None
+        start = time.perf_counter()
+        ids, recall = self.index.search(title, self.recall, self.max_chars)
+        text = self.index.excerpts(ids)
+        if metrics is not None:
+            metrics.record("retrieval", time.perf_counter() - start, title,
+                           recall=recall, chunks=len(ids), chars=len(text),
+                           drs_chars=len(self.target_drs))
+        return text
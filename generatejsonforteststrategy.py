@@ -1,25 +1,16 @@
-import json
-import re
-import boto3
 import html
-from langchain_aws import ChatBedrock
-from langchain_core.messages import HumanMessage
-
-def stream_strategy_generator(sample_drs, sample_strat, target_drs):
-    # 1. Setup Bedrock
-    bedrock_client = boto3.client(
-        service_name="bedrock-runtime",
-        region_name="us-east-1",
-        verify=False 
-    )
-
-    chat = ChatBedrock(
-        client=bedrock_client,
-        model_id="anthropic.claude-3-sonnet-20240229-v1:0",
-        model_kwargs={"temperature": 0.1, "max_tokens": 4096}
-    )
-
-    yield """
+from django.urls import reverse
+from .artifact_store import StrategyArtifacts
+from .bedrock_client import get_generation_chats
+from .drs_index import RequirementContext
+from .outline_parser import OutlineError, OutlineParser
+from .outline_store import STRUCTURED, get_outline_store, stream_outline
+from .metrics import instrumented
+from .prompt_context import TokenReport, build_shared_context, prompt_caching_enabled, section_task
+from .section_runner import SECTION_CONCURRENCY, SectionPipeline
+
+# --- Static page parts ---
+PAGE_HEADER = """
     <html>
     <head>
         <style>
@@ -46,44 +37,86 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
         <h2>Generating Test Strategy...</h2>
         
         <div class="btn-group">
-            <button id="download-md-btn" class="btn btn-md" onclick="downloadFile('md')">Download .MD</button>
-            <button id="download-json-btn" class="btn btn-json" onclick="downloadFile('json')">Download .JSON</button>
+            <a id="download-md-btn" class="btn btn-md">Download .MD</a>
+            <a id="download-json-btn" class="btn btn-json">Download .JSON</a>
         </div>
 
         <div id="stream-container">
     """
 
+PAGE_FOOTER = """
+        </div>
+        <script>
+            window.scrollTo(0, document.body.scrollHeight);
+        </script>
+    </body>
+    </html>
+    """
+
+
+@instrumented("structured")
+def stream_strategy_generator(sample_drs, sample_strat, target_drs, max_workers=SECTION_CONCURRENCY, stream_tokens=True, use_cache=True, metrics=None):
+    # 1. Setup Bedrock (pooled client + chat, shared across requests and threads)
+    with metrics.span("client_setup"):
+        chat, outline_chat = get_generation_chats(metrics, use_cache)
+
+    yield PAGE_HEADER
+
+    # STYLE REFERENCE (+ INPUT REQUIREMENT for small DRS) is built once and sent as a
+    # shared prefix, cacheable where the model supports prompt caching; a large
+    # DRS is indexed and each section gets its own excerpts
+    with metrics.span("drs_index"):
+        requirements = RequirementContext(target_drs)
+    caching = prompt_caching_enabled(chat.model_id)
+    shared_context = build_shared_context(sample_strat, requirements.shared_text, caching)
+    token_report = TokenReport(shared_context, caching)
+
+    def write_section(section_obj):
+        title = section_obj.get('title', 'Unknown Section')
+        # Only the task (and its excerpts) changes per section; the shared context is the cached prefix
+        messages = [shared_context, section_task(title, requirements.for_section(title, metrics))]
+        token_report.wait_for_prefix()
+        if stream_tokens:
+            return token_report.track_stream(chat.stream(messages), title)
+        try:
+            response = chat.invoke(messages)
+        finally:
+            token_report.set_prefix_ready()
+        token_report.count_call(response)
+        token_report.add_usage(response, title)
+        return [response.content]
+
+    # Sections run in parallel and are streamed back in outline order
+    pipeline = SectionPipeline(write_section, max_workers)
+
     # 2. Step A: Generate the Outline (UPDATED PROMPT)
     yield '<div class="status-update">Phase 1: Analyzing samples and creating Structured Outline...</div>'
 
-    # Matches the prompt in your image
-    outline_prompt = (
-        f"Analyze this Sample Strategy:\n{sample_strat}\n\n"
-        "Extract the Section Headers and Sub-headers used in this document to create a skeletal outline. "
-        "Return ONLY a JSON list of objects. Each object must have two keys:\n"
-        "1. 'title': The text of the header (remove numbering like 1, 1.1, etc.)\n"
-        "2. 'level': An integer representing the hierarchy (1 for Main Header, 2 for Sub-header, 3 for sub-sub-header).\n\n"
-        "Example Output format:\n"
-        "[\n"
-        "  {\"title\": \"Scope\", \"level\": 1},\n"
-        "  {\"title\": \"In Scope\", \"level\": 2},\n"
-        "  {\"title\": \"Out of Scope\", \"level\": 2},\n"
-        "  {\"title\": \"Risk Analysis\", \"level\": 1}\n"
-        "]"
-    )
-
+    # --- Outline: reuse the stored one for a known sample strategy, else ask the model ---
+    raw_content = ""
+    outline_store = get_outline_store()
     try:
-        response = chat.invoke([HumanMessage(content=outline_prompt)])
-        raw_content = response.content.strip()
-        match = re.search(r'\[.*\]', raw_content, re.DOTALL)
-
-        if match:
-            json_str = match.group(0)
-            sections = json.loads(json_str) # List of dicts: [{'title': '...', 'level': 1}, ...]
+        with metrics.span("outline"):
+            sections = outline_store.get(sample_strat, STRUCTURED)
+            outline_reused = sections is not None
+            if outline_reused:
+                for section_obj in sections:
+                    pipeline.add(section_obj)
+            else:
+                # List of dicts: [{'title': '...', 'level': 1}, ...]
+                outline = OutlineParser(STRUCTURED)
+                # Each section starts generating as soon as the streamed outline completes it
+                for section_obj in stream_outline(outline_chat, sample_strat, outline, metrics):
+                    pipeline.add(section_obj)
+                sections, raw_content = outline.sections, outline.text
+                # A truncated reply still yields its finished sections, but is not kept
+                if outline.complete:
+                    outline_store.put(sample_strat, STRUCTURED, sections)
+        if not outline_reused:
+            yield f'<div class="status-success">Outline Created: {len(sections)} sections identified.</div>'
         else:
-            sections = json.loads(raw_content)
-
-        yield f'<div class="status-success">Outline Created: {len(sections)} sections identified.</div>'
+            metrics.incr("outline_reused")
+            yield f'<div class="status-success">Outline reused for this Sample Strategy: {len(sections)} sections.</div>'
         
         # Display Outline with indentation based on level
         yield '<ul class="outline-list">'
@@ -92,93 +125,63 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
             yield f'<li style="margin-left: {indent}px;">{sec["title"]}</li>'
         yield '</ul><hr>'
 
+    except OutlineError as e:
+        pipeline.close()
+        yield f'<div class="error-box">Error parsing outline: {str(e)}<br>Raw output: {e.raw_content}</div>'
+        return
     except Exception as e:
+        pipeline.close()
         yield f'<div class="error-box">Error parsing outline: {str(e)}<br>Raw output: {raw_content}</div>'
         return
+    except GeneratorExit:
+        # Client gone before reading any section: stop the ones already started
+        pipeline.close()
+        raise
 
-    # 3. Step B: Loop through Sections
-    full_document = []
-    json_data = [] 
+    # 3. Step B: Generate Sections (started during the outline, streamed back in outline order)
+    # .md / .json are written on the server as each section completes
+    artifacts = StrategyArtifacts(("md", "json"))
 
-    for section_obj in sections:
+    for section_obj, stream in pipeline:
         # Extract title and level safely
         title = section_obj.get('title', 'Unknown Section')
         level = int(section_obj.get('level', 1))
         
         yield f'<div class="status-update">Generating: <strong>{title}</strong>...</div>'
 
-        section_prompt = (
-            f"You are writing a Test Strategy. \n"
-            f"STYLE REFERENCE: {sample_strat}\n"
-            f"INPUT REQUIREMENT: {target_drs}\n\n"
-            f"TASK: Write ONLY the content for the section: '{title}'. "
-            "Do not include the section header itself in the output, just the body text. "
-            "Maintain the exact tone and formatting of the Style Reference."
-        )
-
-        chunk_resp = chat.invoke([HumanMessage(content=section_prompt)])
-        content = chunk_resp.content
-
-        # --- MD Generation: Create hashes (#, ##, ###) based on level ---
-        header_hashes = '#' * level
-        full_document.append(f"{header_hashes} {title}\n{content}")
-        
-        # --- JSON Generation: Store title, level, and content ---
-        json_data.append({
-            "title": title,
-            "level": level,
-            "content": content
-        })
-
-        # --- HTML Preview: Use standard h1-h6 tags ---
-        yield f'<div class="section-block"><h{level}>{title}</h{level}><div class="content">{content}</div></div>'
-
-    # 4. Final Hidden Block
-    final_md = "\n\n".join(full_document)
-    final_json_str = json.dumps(json_data, indent=4)
-
-    yield f'<div id="final-md-content" style="display:none;">{final_md}</div>'
-    yield f'<div id="final-json-content" style="display:none;">{final_json_str}</div>'
-    
-    yield """
+        # --- HTML Preview: tokens go straight into the open section-block ---
+        yield f'<div class="section-block"><h{level}>{title}</h{level}><div class="content">'
+        for text in stream:
+            yield text
+        yield '</div></div>'
+
+        # --- MD (#, ##, ### by level) and JSON ({title, level, content}) artifacts ---
+        artifacts.add_section(title, stream.text, level)
+        input_tokens, output_tokens = token_report.by_section.get(title, (None, None))
+        metrics.record("section", stream.last_token_latency or 0.0, title,
+                       first_token=stream.first_token_latency,
+                       input_tokens=input_tokens, output_tokens=output_tokens)
+
+    # 4. Download Links (the files are served from the artifact store, not re-sent in the page)
+    with metrics.span("assembly"):
+        tokens = artifacts.finish()
+    metrics.incr("input_tokens", token_report.input_tokens)
+    metrics.incr("output_tokens", token_report.output_tokens)
+    md_url = reverse('download_artifact', args=[tokens['md']])
+    json_url = reverse('download_artifact', args=[tokens['json']])
+
+    yield f"""
     <script>
-        document.getElementById("download-md-btn").style.display = "inline-block";
-        document.getElementById("download-json-btn").style.display = "inline-block";
+        var mdBtn = document.getElementById("download-md-btn");
+        var jsonBtn = document.getElementById("download-json-btn");
+        mdBtn.href = "{md_url}";
+        jsonBtn.href = "{json_url}";
+        mdBtn.style.display = "inline-block";
+        jsonBtn.style.display = "inline-block";
     </script>
     """
     
+    yield f'<div class="status-update">{token_report.summary()}</div>'
     yield '<div class="status-success">Generation Complete!</div>'
 
-    yield """
-        </div>
-        <script>
-            function downloadFile(type) {
-                let content = "";
-                let filename = "";
-                let mimeType = "";
-
-                if (type === 'md') {
-                    content = document.getElementById('final-md-content').innerText;
-                    filename = 'generated_strategy.md';
-                    mimeType = 'text/markdown';
-                } else if (type === 'json') {
-                    content = document.getElementById('final-json-content').innerText;
-                    filename = 'generated_strategy.json';
-                    mimeType = 'application/json';
-                }
-
-                const blob = new Blob([content], { type: mimeType });
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = filename;
-                document.body.appendChild(a);
-                a.click();
-                document.body.removeChild(a); 
-                window.URL.revokeObjectURL(url);
-            }
-            window.scrollTo(0, document.body.scrollHeight);
-        </script>
-    </body>
-    </html>
-    """
+    yield PAGE_FOOTER
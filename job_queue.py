@@ -0,0 +1,392 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import path, reverse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Background generation jobs. Queue and progress events live in one SQLite
+# file, so jobs need no external services and outlive the HTTP request.
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", "jobs.sqlite3")
+JOB_WORKERS = 2                  # generations running at once per process
+JOB_RETENTION = 24 * 60 * 60     # seconds a finished job and its events are kept
+EVENT_FLUSH_CHARS = 4096         # yielded HTML is persisted in batches of about this size...
+EVENT_FLUSH_DELAY = 0.25         # ...or at least this often (seconds)
+EVENTS_PER_POLL = 500
+JOB_STALE_AFTER = 10 * 60        # a 'running' job silent this long belongs to a dead process
+JOB_HEARTBEAT = 30               # seconds between 'updated' bumps of the jobs a process is running
+JOB_RECOVER_EVERY = 60           # seconds between checks for jobs left by a dead process
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+# --- 1. Storage ---
+class JobStore:
+    """SQLite-backed job queue plus the HTML events each job has produced."""
+
+    def __init__(self, path=JOB_STORE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " target TEXT NOT NULL,"
+            " args TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " error TEXT,"
+            " created REAL NOT NULL,"
+            " updated REAL NOT NULL,"
+            " attempt INTEGER NOT NULL DEFAULT 1)"
+        )
+        # Stores created before jobs were numbered by attempt
+        if "attempt" not in [r[1] for r in self._conn.execute("PRAGMA table_info(jobs)")]:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN attempt INTEGER NOT NULL DEFAULT 1")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " job_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " html TEXT NOT NULL,"
+            " PRIMARY KEY (job_id, seq))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self._conn.commit()
+
+    def create(self, target, args):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, target, args, status, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, target, json.dumps(args), QUEUED, now, now),
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self):
+        """Marks the oldest queued job as running and returns (id, target, args), or None."""
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT id, target, args FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                # Conditional update: another process may have claimed it in between
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated = ? WHERE id = ? AND status = ?",
+                    (RUNNING, time.time(), row[0], QUEUED),
+                ).rowcount
+                self._conn.commit()
+                if claimed:
+                    return row[0], row[1], json.loads(row[2])
+
+    def append_event(self, job_id, html):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, seq, html) VALUES ("
+                " ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?), ?)",
+                (job_id, job_id, html),
+            )
+            self._conn.execute("UPDATE jobs SET updated = ? WHERE id = ?", (time.time(), job_id))
+            self._conn.commit()
+
+    def heartbeat(self, job_ids):
+        """Marks running jobs as alive, so recover() leaves them alone while they are silent."""
+        if not job_ids:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET updated = ? WHERE id = ? AND status = ?",
+                [(now, job_id, RUNNING) for job_id in job_ids],
+            )
+            self._conn.commit()
+
+    def finish(self, job_id, status, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def _get(self, job_id):
+        row = self._conn.execute(
+            "SELECT status, error, created, updated, attempt FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"id": job_id, "status": row[0], "error": row[1], "created": row[2], "updated": row[3],
+                "attempt": row[4]}
+
+    def get(self, job_id):
+        with self._lock:
+            return self._get(job_id)
+
+    def events(self, job_id, after=0, limit=EVENTS_PER_POLL):
+        """
+        (job, [(seq, html), ...]): the job as get() returns it and the events
+        of its current attempt produced after sequence number `after`, read
+        together so they always belong to the same attempt. job is None for
+        an unknown job.
+        """
+        with self._lock:
+            job = self._get(job_id)
+            if job is None:
+                return None, []
+            return job, self._conn.execute(
+                "SELECT seq, html FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+
+    def recover(self, stale_after=JOB_STALE_AFTER):
+        """
+        Requeues jobs left 'running' by a dead process (restart/crash), i.e.
+        with no progress for stale_after seconds. They start over as a new
+        attempt: the partial events are dropped and seq restarts at 1, so a
+        job page that sees the attempt change starts its document over.
+        """
+        cutoff = time.time() - stale_after
+        requeued = 0
+        with self._lock:
+            stale = [r[0] for r in self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND updated < ?", (RUNNING, cutoff)
+            )]
+            for job_id in stale:
+                # Conditional update: another process may have recovered (and claimed) it meanwhile
+                if self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempt = attempt + 1 WHERE id = ? AND status = ? AND updated < ?",
+                    (QUEUED, job_id, RUNNING, cutoff),
+                ).rowcount:
+                    self._conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+                    requeued += 1
+            self._conn.commit()
+        return requeued
+
+    def purge(self, retention=JOB_RETENTION):
+        cutoff = time.time() - retention
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM job_events WHERE job_id IN ("
+                " SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?)",
+                (DONE, FAILED, cutoff),
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, cutoff)
+            )
+            self._conn.commit()
+
+
+# --- 2. Worker Pool ---
+class JobRunner:
+    """
+    In-process worker threads that run queued jobs. A job target is the
+    dotted path of a generator function; everything it yields is persisted
+    as progress events, so the browser can (re)attach at any time and the
+    run continues if the client goes away.
+    """
+
+    def __init__(self, store, workers=JOB_WORKERS):
+        self.store = store
+        self.workers = workers
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._recover_lock = threading.Lock()
+        self._next_recover = 0.0
+
+    def start(self):
+        self._recover()
+        self.store.purge()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        self._wakeup.set()
+
+    def _recover(self):
+        """
+        Requeues jobs whose process died. Runs at start and then every
+        JOB_RECOVER_EVERY seconds from an idle worker: a job interrupted by
+        a restart only goes stale JOB_STALE_AFTER after the new process is up.
+        """
+        with self._recover_lock:
+            if time.monotonic() < self._next_recover:
+                return
+            self._next_recover = time.monotonic() + JOB_RECOVER_EVERY
+        requeued = self.store.recover()
+        if requeued:
+            logger.warning("Requeued %d interrupted generation job(s).", requeued)
+            self._wakeup.set()
+
+    def _heartbeat(self):
+        # A section can run for minutes without yielding; the job is still alive
+        while True:
+            time.sleep(JOB_HEARTBEAT)
+            with self._running_lock:
+                running = list(self._running)
+            try:
+                self.store.heartbeat(running)
+            except sqlite3.Error:
+                logger.exception("Job heartbeat failed")
+
+    def submit(self, func, *args):
+        """Queues func(*args) (args must be JSON-serialisable) and returns the job id."""
+        job_id = self.store.create(f"{func.__module__}.{func.__qualname__}", list(args))
+        self._wakeup.set()
+        return job_id
+
+    def _work(self):
+        while True:
+            self._wakeup.clear()
+            claimed = self.store.claim()
+            if claimed is None:
+                self._recover()
+                self._wakeup.wait(timeout=5)
+                continue
+            with self._running_lock:
+                self._running.add(claimed[0])
+            try:
+                self._run(*claimed)
+            finally:
+                with self._running_lock:
+                    self._running.discard(claimed[0])
+
+    def _run(self, job_id, target, args):
+        buffer = []
+        size = 0
+        last_flush = time.monotonic()
+        try:
+            for html in import_string(target)(*args):
+                buffer.append(html)
+                size += len(html)
+                if size >= EVENT_FLUSH_CHARS or time.monotonic() - last_flush >= EVENT_FLUSH_DELAY:
+                    self.store.append_event(job_id, "".join(buffer))
+                    buffer.clear()
+                    size = 0
+                    last_flush = time.monotonic()
+        except Exception as e:
+            buffer.append(f'<div class="error-box">Generation failed: {str(e)}</div>')
+            self.store.append_event(job_id, "".join(buffer))
+            self.store.finish(job_id, FAILED, str(e))
+            return
+        if buffer:
+            self.store.append_event(job_id, "".join(buffer))
+        self.store.finish(job_id, DONE)
+
+
+_default_runner = None
+_default_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Process-wide JobRunner on JOB_STORE_PATH; workers start on first use."""
+    global _default_runner
+    if _default_runner is None:
+        with _default_lock:
+            if _default_runner is None:
+                runner = JobRunner(JobStore())
+                runner.start()
+                _default_runner = runner
+    return _default_runner
+
+
+# --- 3. Views ---
+# The job page replays the stored HTML into an iframe with document.write,
+# exactly as the browser would have parsed the original streamed response
+# (partial tags across events and inline <script> blocks included).
+JOB_PAGE_HTML = """
+<html>
+<head>
+    <title>Test Strategy Job</title>
+    <style>
+        body { font-family: sans-serif; margin: 0; }
+        #job-status { max-width: 800px; margin: 1rem auto 0; padding: 0 1rem; color: #666; font-size: 13px; }
+        #job-frame { width: 100%; border: none; min-height: 80vh; }
+    </style>
+</head>
+<body>
+    <div id="job-status">Queued...</div>
+    <iframe id="job-frame"></iframe>
+    <script>
+        var eventsUrl = "__EVENTS_URL__";
+        var after = 0;
+        var attempt = null;
+        var frame = document.getElementById('job-frame');
+        var doc = frame.contentWindow.document;
+        doc.open();
+
+        function poll() {
+            fetch(eventsUrl + "?after=" + after)
+                .then(function (r) { return r.json(); })
+                .then(function (data) {
+                    if (attempt !== null && data.attempt !== attempt) {
+                        // The job was restarted after a crash: replay the new attempt from its start
+                        attempt = data.attempt;
+                        after = 0;
+                        doc.open();
+                        setTimeout(poll, 0);
+                        return;
+                    }
+                    attempt = data.attempt;
+                    data.events.forEach(function (e) { doc.write(e[1]); after = e[0]; });
+                    frame.style.height = (doc.body ? doc.body.scrollHeight + 40 : 0) + "px";
+                    document.getElementById('job-status').innerText = "Job " + data.status;
+                    if (data.more || (data.status !== "done" && data.status !== "failed")) {
+                        setTimeout(poll, data.more ? 0 : 1000);
+                    } else {
+                        doc.close();
+                    }
+                })
+                .catch(function () { setTimeout(poll, 3000); });
+        }
+        poll();
+    </script>
+</body>
+</html>
+"""
+
+
+def job_page(request, job_id):
+    """Lightweight page that (re)attaches to a job by polling job_events."""
+    if get_job_runner().store.get(job_id) is None:
+        raise Http404("Unknown job.")
+    events_url = reverse('job_events', args=[job_id])
+    return HttpResponse(JOB_PAGE_HTML.replace("__EVENTS_URL__", events_url))
+
+
+def job_events(request, job_id):
+    """JSON: the job's status and attempt plus the HTML events after ?after=<seq>."""
+    try:
+        after = int(request.GET.get("after", 0))
+    except ValueError:
+        after = 0
+    job, events = get_job_runner().store.events(job_id, after)
+    if job is None:
+        raise Http404("Unknown job.")
+    return JsonResponse({
+        "status": job["status"],
+        "error": job["error"],
+        "attempt": job["attempt"],
+        "events": events,
+        "more": len(events) == EVENTS_PER_POLL,
+    })
+
+
+# --- 4. URL Configuration (If pasting into urls.py) ---
+urlpatterns = [
+    path('jobs/<str:job_id>/', job_page, name='job_page'),
+    path('jobs/<str:job_id>/events/', job_events, name='job_events'),
+]
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Where cached Bedrock responses live. One SQLite file shared by all
+# workers/processes on the host.
+CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.sqlite3")
+CACHE_TTL = 24 * 60 * 60      # seconds a response stays valid
+CACHE_MAX_ENTRIES = 5000      # least recently used entries beyond this are evicted
+
+CACHE_HIT = "cache_hit"       # response_metadata flag on replies served from the cache
+
+
+def is_cache_hit(message):
+    """True for a reply (or streamed chunk) replayed from the response cache, not the model."""
+    return bool((getattr(message, "response_metadata", None) or {}).get(CACHE_HIT))
+
+
+def cache_key(model_id, model_kwargs, messages):
+    """Content address: hash of model, its kwargs and the exact prompt messages."""
+    payload = json.dumps(
+        {
+            "model_id": model_id,
+            "model_kwargs": model_kwargs or {},
+            "messages": [[m.type, m.content] for m in messages],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL expiry and LRU size eviction."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " content TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content, created = row
+            if now - created > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return content
+
+    def set(self, key, content):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, content, now, now),
+            )
+            # Expired first, then least recently used over the size limit
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+
+class CachedChat:
+    """
+    Wraps a ChatBedrock so invoke() and stream() check the response cache
+    first. Hits come back immediately (as a single chunk when streaming)
+    and are flagged for is_cache_hit(); misses are forwarded to the model
+    and stored once complete. Hits and misses are counted on the optional
+    RunMetrics.
+    """
+
+    def __init__(self, chat, cache, metrics=None):
+        self.chat = chat
+        self.cache = cache
+        self.metrics = metrics
+
+    def _lookup(self, key):
+        content = self.cache.get(key)
+        if self.metrics is not None:
+            self.metrics.incr("cache_hits" if content is not None else "cache_misses")
+        return content
+
+    @property
+    def model_id(self):
+        return self.chat.model_id
+
+    @property
+    def model_kwargs(self):
+        return self.chat.model_kwargs
+
+    def _key(self, messages):
+        return cache_key(self.model_id, self.model_kwargs, messages)
+
+    def invoke(self, messages):
+        key = self._key(messages)
+        content = self._lookup(key)
+        if content is not None:
+            return AIMessage(content=content, response_metadata={CACHE_HIT: True})
+
+        response = self.chat.invoke(messages)
+        self.cache.set(key, response.content)
+        return response
+
+    def stream(self, messages):
+        key = self._key(messages)
+        content = self._lookup(key)
+        if content is not None:
+            yield AIMessageChunk(content=content, response_metadata={CACHE_HIT: True})
+            return
+
+        parts = []
+        for chunk in self.chat.stream(messages):
+            parts.append(chunk.content)
+            yield chunk
+        # Only complete replies are cached; an interrupted stream never gets here.
+        self.cache.set(key, "".join(parts))
+
+    # --- async (ASGI); the SQLite lookups are sub-millisecond, so they stay inline ---
+    async def ainvoke(self, messages):
+        key = self._key(messages)
+        content = self._lookup(key)
+        if content is not None:
+            return AIMessage(content=content, response_metadata={CACHE_HIT: True})
+
+        response = await self.chat.ainvoke(messages)
+        self.cache.set(key, response.content)
+        return response
+
+    async def astream(self, messages):
+        key = self._key(messages)
+        content = self._lookup(key)
+        if content is not None:
+            yield AIMessageChunk(content=content, response_metadata={CACHE_HIT: True})
+            return
+
+        parts = []
+        async for chunk in self.chat.astream(messages):
+            parts.append(chunk.content)
+            yield chunk
+        self.cache.set(key, "".join(parts))
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide ResponseCache at CACHE_PATH."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = ResponseCache()
+    return _default_cache
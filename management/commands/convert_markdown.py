@@ -0,0 +1,96 @@
+import io
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from ...batch_convert import (
+    BATCH_WORKERS, BatchError, MARKDOWN_EXTENSIONS, convert_many, iter_markdown_inputs,
+    shutdown_process_pool, stream_docx_zip, write_outputs,
+)
+
+
+def _collect(paths):
+    """
+    Input files as in-memory file objects named like upload / zip members:
+    the file name for files given directly, the path relative to the folder
+    for files found under a given folder (so outputs keep the layout).
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith(MARKDOWN_EXTENSIONS + ('.zip',)):
+                        full = os.path.join(root, name)
+                        yield _load(full, os.path.relpath(full, path))
+        elif os.path.isfile(path):
+            yield _load(path, os.path.basename(path))
+        else:
+            raise CommandError(f"No such file or directory: {path}")
+
+
+def _load(path, name):
+    with open(path, 'rb') as f:
+        data = io.BytesIO(f.read())
+    data.name = name
+    return data
+
+
+class Command(BaseCommand):
+    help = "Converts Markdown files (or folders / .zip archives of them) to .docx in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Markdown files, folders or .zip archives.')
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--output', help='Folder to write the .docx files to.')
+        target.add_argument('--zip', help='Write all .docx files into this zip archive instead.')
+        parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help='Worker processes (default: CPU count).')
+        parser.add_argument(
+            '--converter', default='docx_reader.md_token_converter.TokenMarkdownToDocx',
+            help='Dotted path of the converter class (e.g. docx_reader.mdtodoc.MarkdownToDocx).',
+        )
+
+    def handle(self, *args, **options):
+        converter_class = import_string(options['converter'])
+        try:
+            inputs = list(iter_markdown_inputs(_collect(options['paths'])))
+        except BatchError as e:
+            raise CommandError(str(e))
+        if not inputs:
+            raise CommandError("No markdown files found.")
+
+        start = time.perf_counter()
+        try:
+            converted, errors = self._convert(inputs, converter_class, options)
+        finally:
+            shutdown_process_pool()
+        seconds = time.perf_counter() - start
+
+        for name, error in errors:
+            self.stderr.write(f"{name}: {error}")
+        self.stdout.write(
+            f"Converted {converted} of {len(inputs)} files in {seconds:.1f}s "
+            f"({converted / seconds if seconds else 0:.1f} files/s, {options['workers']} workers)."
+        )
+
+    def _convert(self, inputs, converter_class, options):
+        results = convert_many(inputs, converter_class, options['workers'])
+        if options['zip']:
+            converted = 0
+            errors = []
+
+            def counted(results):
+                nonlocal converted
+                for name, data, error in results:
+                    if error is None:
+                        converted += 1
+                    else:
+                        errors.append((name, error))
+                    yield name, data, error
+
+            with open(options['zip'], 'wb') as out:
+                for chunk in stream_docx_zip(counted(results)):
+                    out.write(chunk)
+            return converted, errors
+        return write_outputs(results, options['output'])
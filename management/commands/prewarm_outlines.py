@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...bedrock_client import get_chat
+from ...rate_governor import GovernedChat
+from ...outline_store import FLAT, STRUCTURED, get_outline_store, prewarm_directory
+
+
+class Command(BaseCommand):
+    help = "Pre-computes the Phase 1 outline for every sample strategy (.docx/.md/.txt) in a directory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Folder containing the known sample strategies.')
+        parser.add_argument(
+            '--variant', choices=[FLAT, STRUCTURED], action='append',
+            help='Outline variant to store (default: both).',
+        )
+        parser.add_argument('--force', action='store_true', help='Regenerate outlines that are already stored.')
+
+    def handle(self, *args, **options):
+        variants = options['variant'] or [FLAT, STRUCTURED]
+        try:
+            results = prewarm_directory(
+                options['directory'], GovernedChat(get_chat()), get_outline_store(),
+                variants=variants, force=options['force'],
+            )
+            for name, variant, status in results:
+                self.stdout.write(f"{name} [{variant}]: {status}")
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
@@ -1,3 +1,5 @@
+from .docx_tables import add_table_bulk
+
 # --- 1. The Converter Logic (Core Logic) ---
 
 class MarkdownToDocx:
@@ -97,22 +99,8 @@ class MarkdownToDocx:
         if not rows:
             return
 
-        # Determine number of columns
-        first_row_cols = rows[0].find_all(['th', 'td'])
-        num_cols = len(first_row_cols)
-        num_rows = len(rows)
-
-        # Create table
-        table = self.document.add_table(rows=num_rows, cols=num_cols)
-        table.style = 'Table Grid'
-
-        for i, row in enumerate(rows):
-            cols = row.find_all(['th', 'td'])
-            for j, col in enumerate(cols):
-                if j < num_cols:
-                    cell = table.cell(i, j)
-                    cell.text = col.get_text().strip()
-                    if row.find('th'):
-                        for paragraph in cell.paragraphs:
-                            for run in paragraph.runs:
-                                run.font.bold = True
+        # Cell text and header flag are read once per row; the whole table is
+        # then written in one pass (table.cell(i, j) per cell is quadratic)
+        data = [[col.get_text().strip() for col in row.find_all(['th', 'td'])] for row in rows]
+        header_rows = [row.find('th') is not None for row in rows]
+        add_table_bulk(self.document, data, header_rows)
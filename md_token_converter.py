@@ -0,0 +1,180 @@
+import logging
+
+from docx import Document
+from markdown_it import MarkdownIt
+
+from .docx_tables import add_table_bulk
+
+logger = logging.getLogger(__name__)
+
+# CommonMark + GFM tables. Fenced code is part of CommonMark.
+_md = MarkdownIt('commonmark').enable('table')
+
+
+class TokenMarkdownToDocx:
+    """
+    Converts markdown text to a docx object straight from the markdown-it
+    token stream, without rendering HTML and re-parsing it with
+    BeautifulSoup. Output matches MarkdownToDocx (mdToDocSubHeading.py):
+    headings, paragraphs, nested lists ('List Bullet 2', 'List Number 3', ...)
+    and tables with a bold header row. Like the HTML path, top-level code
+    blocks, block quotes and rules are skipped.
+
+    Note: markdown-it follows CommonMark list nesting (indent to the item's
+    content column), so 2-space nested lists nest here as most LLM output
+    intends, where Python-Markdown needed 4 spaces.
+    """
+
+    def __init__(self):
+        self.document = Document()
+        self._styles = {}
+        self._style_ids = {}
+
+    def convert(self, md_text):
+        """
+        Converts markdown text to a docx object.
+        """
+        tokens = _md.parse(md_text)
+        i = 0
+        while i < len(tokens):
+            i = self._process_block(tokens, i)
+        return self.document
+
+    # --- Block Dispatch ---
+    def _process_block(self, tokens, i):
+        """Handles the top-level block starting at tokens[i]; returns the next index."""
+        token = tokens[i]
+        kind = token.type
+
+        if kind == 'heading_open':
+            level = int(token.tag[1])
+            if 1 <= level <= 9:
+                self._add_paragraph(_inline_text(tokens[i + 1]), f"Heading {level}")
+            return i + 3
+
+        if kind == 'paragraph_open':
+            self.document.add_paragraph(_inline_text(tokens[i + 1]))
+            return i + 3
+
+        if kind in ('bullet_list_open', 'ordered_list_open'):
+            return self._process_list(tokens, i, level=1)
+
+        if kind == 'table_open':
+            return self._process_table(tokens, i)
+
+        # Anything else (fence, code_block, blockquote, hr, html_block) is skipped
+        return _skip(tokens, i)
+
+    def _add_paragraph(self, text, style_name=None):
+        """
+        add_paragraph() with the style id resolved once per name. python-docx
+        re-scans every style in the document on each add_paragraph(style=...)
+        call, which costs more than parsing the markdown itself.
+        """
+        paragraph = self.document.add_paragraph(text)
+        if style_name is not None:
+            style_id = self._style_ids.get(style_name)
+            if style_id is None:
+                style_id = self.document.styles[style_name].style_id
+                self._style_ids[style_name] = style_id
+            paragraph._p.style = style_id
+        return paragraph
+
+    # --- Lists ---
+    def _list_style(self, ordered, level):
+        key = (ordered, level)
+        style = self._styles.get(key)
+        if style is None:
+            base_style = 'List Number' if ordered else 'List Bullet'
+            style_name = f"{base_style} {level}" if level > 1 else base_style
+            try:
+                self.document.styles[style_name]
+                style = style_name
+            except KeyError:
+                # Fallback if the specific level style doesn't exist in the doc template
+                logger.warning("Style '%s' not found. Falling back to '%s'.", style_name, base_style)
+                style = base_style
+            self._styles[key] = style
+        return style
+
+    def _process_list(self, tokens, i, level):
+        """
+        Walks one list (tokens[i] is its *_list_open) and its nested lists.
+        Item text is everything in the item except nested lists.
+        """
+        style_name = self._list_style(tokens[i].type == 'ordered_list_open', level)
+        close_type = tokens[i].type.replace('_open', '_close')
+        i += 1
+
+        while tokens[i].type != close_type:
+            # tokens[i] is list_item_open
+            i += 1
+            text_parts = []
+
+            def flush():
+                item_text = "\n".join(text_parts).strip()
+                if item_text:
+                    self._add_paragraph(item_text, style_name)
+                text_parts.clear()
+
+            while tokens[i].type != 'list_item_close':
+                kind = tokens[i].type
+                if kind in ('bullet_list_open', 'ordered_list_open'):
+                    flush()
+                    i = self._process_list(tokens, i, level=level + 1)
+                elif kind == 'inline':
+                    text_parts.append(_inline_text(tokens[i]))
+                    i += 1
+                elif kind in ('fence', 'code_block'):
+                    text_parts.append(tokens[i].content)
+                    i += 1
+                else:
+                    i += 1
+            flush()
+            i += 1  # list_item_close
+
+        return i + 1  # *_list_close
+
+    # --- Tables ---
+    def _process_table(self, tokens, i):
+        """Collects the table's rows from the token stream and adds it to the DOCX."""
+        rows = []
+        header_rows = []
+        i += 1
+        while tokens[i].type != 'table_close':
+            kind = tokens[i].type
+            if kind == 'tr_open':
+                rows.append([])
+                header_rows.append(False)
+            elif kind in ('th_open', 'td_open'):
+                if kind == 'th_open':
+                    header_rows[-1] = True
+                rows[-1].append(_inline_text(tokens[i + 1]).strip())
+            i += 1
+
+        add_table_bulk(self.document, rows, header_rows)
+        return i + 1
+
+
+def _inline_text(token):
+    """Plain text of an inline token, like BeautifulSoup's get_text() on the rendered HTML."""
+    parts = []
+    for child in token.children or ():
+        kind = child.type
+        if kind in ('text', 'code_inline'):
+            parts.append(child.content)
+        elif kind in ('softbreak', 'hardbreak'):
+            parts.append('\n')
+    return ''.join(parts)
+
+
+def _skip(tokens, i):
+    """Index just past the block that starts at tokens[i]."""
+    if tokens[i].nesting != 1:
+        return i + 1
+    depth = 0
+    while True:
+        depth += tokens[i].nesting
+        i += 1
+        if depth == 0:
+            return i
@@ -1,13 +1,18 @@
+import functools
 import markdown
 from bs4 import BeautifulSoup
 from docx import Document
 from docx.shared import Pt
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views import View
 from django.shortcuts import render
 from django import forms
 from django.urls import path
+from django.utils.translation import get_language
 from django.core.files.uploadedfile import InMemoryUploadedFile
+from .batch_convert import BATCH_WORKERS, BatchError, convert_many, iter_markdown_inputs, stream_docx_zip
+from .docx_tables import add_table_bulk
+from .md_token_converter import TokenMarkdownToDocx
 
 # --- 1. The Converter Logic (Core Logic) ---
 
@@ -69,27 +74,11 @@ class MarkdownToDocx:
         if not rows:
             return
 
-        # Determine number of columns by looking at the first row
-        first_row_cols = rows[0].find_all(['th', 'td'])
-        num_cols = len(first_row_cols)
-        num_rows = len(rows)
-
-        # Create table in Docx
-        table = self.document.add_table(rows=num_rows, cols=num_cols)
-        table.style = 'Table Grid' # Standard grid style
-
-        for i, row in enumerate(rows):
-            cols = row.find_all(['th', 'td'])
-            for j, col in enumerate(cols):
-                if j < num_cols: # Prevention against malformed tables
-                    cell = table.cell(i, j)
-                    cell.text = col.get_text().strip()
-                    
-                    # Optional: Make header row bold
-                    if row.find('th'):
-                        for paragraph in cell.paragraphs:
-                            for run in paragraph.runs:
-                                run.font.bold = True
+        # Cell text and header flag are read once per row; the whole table is
+        # then written in one pass (table.cell(i, j) per cell is quadratic)
+        data = [[col.get_text().strip() for col in row.find_all(['th', 'td'])] for row in rows]
+        header_rows = [row.find('th') is not None for row in rows]
+        add_table_bulk(self.document, data, header_rows)
 
 # --- 2. Django Form ---
 
@@ -99,10 +88,88 @@ class UploadFileForm(forms.Form):
         help_text="Upload a file containing markdown text, tables, and headings."
     )
 
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """FileField that accepts several files (returns a list)."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(d, initial) for d in data]
+        return [single_file_clean(data, initial)]
+
+
+class BatchUploadForm(forms.Form):
+    md_files = MultipleFileField(
+        label="Select Markdown (.md) files or .zip archives",
+        help_text="Every markdown file is converted; the .docx files come back as one zip."
+    )
+
 # --- 3. Django Views ---
 
+SIMPLE_UI_HTML = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Markdown to DOCX Converter</title>
+            <style>
+                body { font-family: sans-serif; max-width: 800px; margin: 40px auto; padding: 20px; }
+                .container { border: 1px solid #ddd; padding: 20px; border-radius: 8px; }
+                button { background-color: #007bff; color: white; border: none; padding: 10px 20px; cursor: pointer; }
+                button:hover { background-color: #0056b3; }
+                .file-input { margin-bottom: 20px; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>MD to DOCX Converter</h1>
+                <p>Upload a markdown file to convert it to a Word document.</p>
+                <form method="post" enctype="multipart/form-data">
+                    {% csrf_token %}
+                    <div class="file-input">
+                        {{ form.as_p }}
+                    </div>
+                    <button type="submit">Convert & Download</button>
+                </form>
+            </div>
+        </body>
+        </html>
+        """
+
+
+@functools.lru_cache(maxsize=None)
+def _simple_ui_template():
+    """The upload page, compiled once per process instead of re-lexed and re-parsed per request."""
+    from django.template import Template
+    return Template(SIMPLE_UI_HTML)
+
+
+def _render_page(form):
+    from django.template import Context
+    # We need to render the csrf token manually if not using full render shortcut context
+    # But render() handles this usually.
+    return _simple_ui_template().render(Context({'form': form}, autoescape=False))
+
+
+@functools.lru_cache(maxsize=32)
+def _unbound_page(form_class, language):
+    """GET page: an unbound form renders the same HTML every time (form.as_p is most of the cost)."""
+    return _render_page(form_class())
+
+
 class MdToDocxView(View):
     template_name = "upload.html" # You would typically have a template file
+    # Direct markdown-it token -> python-docx converter (no HTML/BeautifulSoup
+    # round trip). Set to MarkdownToDocx to use the HTML path instead.
+    converter_class = TokenMarkdownToDocx
 
     def get(self, request):
         # Determine if we are running as a snippet or full app
@@ -124,7 +191,7 @@ class MdToDocxView(View):
                 return HttpResponse("Error: File must be UTF-8 encoded text.", status=400)
 
             # Perform Conversion
-            converter = MarkdownToDocx()
+            converter = self.converter_class()
             docx_document = converter.convert(md_content)
 
             # Create the HTTP Response
@@ -146,46 +213,44 @@ class MdToDocxView(View):
         Helper to render a basic HTML page without needing external templates
         for this code snippet example.
         """
-        from django.template import Template, Context
-        
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Markdown to DOCX Converter</title>
-            <style>
-                body { font-family: sans-serif; max-width: 800px; margin: 40px auto; padding: 20px; }
-                .container { border: 1px solid #ddd; padding: 20px; border-radius: 8px; }
-                button { background-color: #007bff; color: white; border: none; padding: 10px 20px; cursor: pointer; }
-                button:hover { background-color: #0056b3; }
-                .file-input { margin-bottom: 20px; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>MD to DOCX Converter</h1>
-                <p>Upload a markdown file to convert it to a Word document.</p>
-                <form method="post" enctype="multipart/form-data">
-                    {% csrf_token %}
-                    <div class="file-input">
-                        {{ form.as_p }}
-                    </div>
-                    <button type="submit">Convert & Download</button>
-                </form>
-            </div>
-        </body>
-        </html>
-        """
-        
-        t = Template(html_template)
-        c = Context({'form': form})
-        # We need to render the csrf token manually if not using full render shortcut context
-        # But render() handles this usually.
-        return HttpResponse(t.render(Context({'form': form}, autoescape=False)))
+        if not form.is_bound:
+            return HttpResponse(_unbound_page(type(form), get_language()))
+        return HttpResponse(_render_page(form))
+
+
+class BatchMdToDocxView(MdToDocxView):
+    """
+    Batch mode: many .md files and/or .zip archives in, one zip of .docx out.
+    Files are converted in parallel across a process pool and the zip is
+    streamed back as conversions finish.
+    """
+    workers = BATCH_WORKERS
+
+    def get(self, request):
+        return self._render_simple_ui(request, BatchUploadForm())
+
+    def post(self, request):
+        form = BatchUploadForm(request.POST, request.FILES)
+
+        if form.is_valid():
+            try:
+                inputs = list(iter_markdown_inputs(form.cleaned_data['md_files']))
+            except BatchError as e:
+                return HttpResponse(f"Error: {e}", status=400)
+            if not inputs:
+                return HttpResponse("Error: No markdown files found in the upload.", status=400)
+
+            results = convert_many(inputs, self.converter_class, self.workers)
+            response = StreamingHttpResponse(stream_docx_zip(results), content_type='application/zip')
+            response['Content-Disposition'] = 'attachment; filename="converted_docx.zip"'
+            return response
+
+        return self._render_simple_ui(request, form)
 
 # --- 4. URL Configuration (If pasting into urls.py) ---
 
 urlpatterns = [
     path('convert/', MdToDocxView.as_view(), name='convert_md'),
+    path('convert/batch/', BatchMdToDocxView.as_view(), name='convert_md_batch'),
 ]
 
@@ -2,6 +2,8 @@ import json
 from docx import Document
 from docx.shared import Pt
 
+from .docx_assembly import DocxAssembler
+
 def create_strategy_document(outline_json, sample_drs_text):
     """
     Takes the JSON outline and generates the full DOCX.
@@ -18,27 +20,34 @@ def create_strategy_document(outline_json, sample_drs_text):
         outline_data = outline_json
 
     # 2. Loop through the outline structure
+    # Each section is written into the document in the background while the
+    # next one is generated, so saving is all that is left after the loop.
+    assembler = DocxAssembler(_write_section, doc)
     for section in outline_data:
         heading_text = section.get('title', 'Untitled')
         heading_level = section.get('level', 1)
 
-        # --- KEY FIX: Use the 'level' directly ---
-        # python-docx handles levels 1-9 natively. 
-        # This solves your "retaining info of sub heading" issue.
-        doc.add_heading(heading_text, level=heading_level)
-
         # 3. Generate content for this specific section
         # We pass the context to the LLM so it knows what to write
         section_content = generate_section_content(heading_text, sample_drs_text)
-        
-        # 4. Add the content to the document
-        # If the content contains simple paragraphs, add them directly
-        if section_content:
-            doc.add_paragraph(section_content)
 
-    doc.save('Generated_Test_Strategy.docx')
+        assembler.add(heading_text, heading_level, section_content)
+
+    assembler.save('Generated_Test_Strategy.docx')
     print("Document saved successfully.")
 
+def _write_section(doc, heading_text, heading_level, section_content):
+    # --- KEY FIX: Use the 'level' directly ---
+    # python-docx handles levels 1-9 natively. 
+    # This solves your "retaining info of sub heading" issue.
+    doc.add_heading(heading_text, level=heading_level)
+
+    # 4. Add the content to the document
+    # If the content contains simple paragraphs, add them directly
+    if section_content:
+        doc.add_paragraph(section_content)
+
+
 # Mock function to represent your LLM call for content generation
 def generate_section_content(heading, context):
     # This is where you would call your LLM
@@ -84,4 +93,4 @@ def add_markdown_content_to_doc(doc, markdown_text):
             pass 
 
 
-#In the main loop, replace #doc.add_paragraph(section_content) with #add_markdown_content_to_doc(doc, #section_content).
\ No newline at end of file
+#In _write_section, replace #doc.add_paragraph(section_content) with #add_markdown_content_to_doc(doc, #section_content).
\ No newline at end of file
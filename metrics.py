@@ -0,0 +1,242 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.http import HttpResponse
+from django.urls import path
+
+logger = logging.getLogger(__name__)
+
+# Optional JSON-lines file that receives one record per generation run.
+METRICS_JSONL_PATH = os.environ.get("METRICS_JSONL_PATH")
+
+# Histogram buckets (seconds) for the Prometheus phase timings.
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+# --- 1. Sinks ---
+# A sink is any callable taking the finished run record (a JSON-able dict).
+_sinks = []
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink):
+    with _sinks_lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    with _sinks_lock:
+        _sinks.remove(sink)
+
+
+def logging_sink(record):
+    """Default sink: one INFO line per run on this module's logger."""
+    logger.info("generation run %s", json.dumps(record, sort_keys=True))
+
+
+class JsonLinesSink:
+    """Appends each run record as one JSON line to a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, sort_keys=True) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+add_sink(logging_sink)
+if METRICS_JSONL_PATH:
+    add_sink(JsonLinesSink(METRICS_JSONL_PATH))
+
+
+# --- 2. Per-Run Metrics ---
+class RunMetrics:
+    """
+    Timing spans and counters for one generation run. Spans are recorded
+    per phase (client_setup, outline, outline_parse, drs_index, retrieval,
+    section, assembly) and, for retrieval and sections, per section name.
+    finish() hands the record to every sink and to the Prometheus registry.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.run_id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._finished = False
+
+    @contextmanager
+    def span(self, phase, name=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, name)
+
+    def record(self, phase, seconds, name=None, **extra):
+        span = {"phase": phase, "seconds": round(seconds, 4)}
+        if name is not None:
+            span["name"] = name
+        span.update({k: round(v, 4) if isinstance(v, float) else v for k, v in extra.items() if v is not None})
+        with self._lock:
+            self.spans.append(span)
+
+    def incr(self, counter, n=1):
+        if not n:
+            return
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def finish(self, status="ok"):
+        with self._lock:
+            if self._finished:
+                return None
+            self._finished = True
+            record = {
+                "run_id": self.run_id,
+                "pipeline": self.pipeline,
+                "status": status,
+                "seconds": round(time.perf_counter() - self.started, 4),
+                "spans": list(self.spans),
+                "counters": dict(self.counters),
+            }
+        REGISTRY.observe_run(record)
+        with _sinks_lock:
+            sinks = list(_sinks)
+        for sink in sinks:
+            try:
+                sink(record)
+            except Exception:
+                logger.exception("metrics sink %r failed", sink)
+        return record
+
+
+def instrumented(pipeline):
+    """
+    Decorator for the streaming generators (sync or async): passes a fresh
+    RunMetrics as metrics=..., counts the bytes yielded and finishes the run
+    when the stream ends, fails or the client goes away.
+    """
+    def decorate(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                run = kwargs["metrics"] = kwargs.get("metrics") or RunMetrics(pipeline)
+                status = "error"
+                try:
+                    async for text in func(*args, **kwargs):
+                        run.incr("bytes_yielded", len(text.encode("utf-8")))
+                        yield text
+                    status = "ok"
+                except (GeneratorExit, asyncio.CancelledError):
+                    status = "disconnected"
+                    raise
+                finally:
+                    run.finish(status)
+            return wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = kwargs["metrics"] = kwargs.get("metrics") or RunMetrics(pipeline)
+            status = "error"
+            try:
+                for text in func(*args, **kwargs):
+                    run.incr("bytes_yielded", len(text.encode("utf-8")))
+                    yield text
+                status = "ok"
+            except GeneratorExit:
+                status = "disconnected"
+                raise
+            finally:
+                run.finish(status)
+        return wrapper
+    return decorate
+
+
+# --- 3. Prometheus Registry ---
+class Registry:
+    """Process-wide aggregates of finished runs, rendered in Prometheus text format."""
+
+    def __init__(self, buckets=PHASE_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._runs = {}        # (pipeline, status) -> count
+        self._counters = {}    # (pipeline, counter) -> total
+        self._phases = {}      # (pipeline, phase) -> [bucket counts..., count, sum]
+
+    def observe_run(self, record):
+        pipeline = record["pipeline"]
+        with self._lock:
+            key = (pipeline, record["status"])
+            self._runs[key] = self._runs.get(key, 0) + 1
+            for counter, value in record["counters"].items():
+                key = (pipeline, counter)
+                self._counters[key] = self._counters.get(key, 0) + value
+            for span in record["spans"] + [{"phase": "total", "seconds": record["seconds"]}]:
+                self._observe(pipeline, span["phase"], span["seconds"])
+
+    def _observe(self, pipeline, phase, seconds):
+        hist = self._phases.setdefault((pipeline, phase), [0] * (len(self.buckets) + 2))
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += seconds
+
+    def render(self):
+        lines = [
+            "# HELP strategy_runs_total Finished generation runs by status.",
+            "# TYPE strategy_runs_total counter",
+        ]
+        with self._lock:
+            for (pipeline, status), count in sorted(self._runs.items()):
+                lines.append(f'strategy_runs_total{{pipeline="{pipeline}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP strategy_events_total Tokens, bytes, cache hits and retries summed over runs.",
+                "# TYPE strategy_events_total counter",
+            ]
+            for (pipeline, counter), total in sorted(self._counters.items()):
+                lines.append(f'strategy_events_total{{pipeline="{pipeline}",event="{counter}"}} {total}')
+
+            lines += [
+                "# HELP strategy_phase_seconds Time spent per pipeline phase.",
+                "# TYPE strategy_phase_seconds histogram",
+            ]
+            for (pipeline, phase), hist in sorted(self._phases.items()):
+                labels = f'pipeline="{pipeline}",phase="{phase}"'
+                for bound, count in zip(self.buckets, hist):
+                    lines.append(f'strategy_phase_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'strategy_phase_seconds_bucket{{{labels},le="+Inf"}} {hist[-2]}')
+                lines.append(f'strategy_phase_seconds_count{{{labels}}} {hist[-2]}')
+                lines.append(f'strategy_phase_seconds_sum{{{labels}}} {hist[-1]:.4f}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# --- 4. Metrics View ---
+def metrics_view(request):
+    """Prometheus scrape endpoint."""
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# --- 5. URL Configuration (If pasting into urls.py) ---
+urlpatterns = [
+    path('metrics/', metrics_view, name='strategy_metrics'),
+]
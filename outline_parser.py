@@ -0,0 +1,251 @@
+import ast
+import json
+import re
+
+# Outline variants:
+#   'flat'       -> ["1. Scope", "2. Risk Analysis", ...]
+#   'structured' -> [{"title": "Scope", "level": 1}, ...]
+FLAT = "flat"
+STRUCTURED = "structured"
+
+MAX_LEVEL = 6  # <h1> .. <h6>
+
+# A '[' that opens a JSON list of sections: followed by an object, a string
+# or the closing ']'. Brackets in prose ("[see below]") do not qualify.
+# \Z: the reply may still be streaming, nothing after the '[' yet.
+_ARRAY_START_RE = re.compile(r"\[(?=\s*(?:[{\"'“\]]|\Z))")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_UNQUOTED_KEY_RE = re.compile(r"([{,]\s*)([A-Za-z_]\w*)\s*:")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+_decoder = json.JSONDecoder()
+
+
+class OutlineError(ValueError):
+    """The reply held no usable outline; raw_content is the reply as received."""
+
+    def __init__(self, message, raw_content=""):
+        super().__init__(message)
+        self.raw_content = raw_content
+
+
+# --- 1. Element Repairs ---
+def _element_end(text, pos):
+    """
+    Index just past the list element starting at pos (quote- and
+    bracket-aware), or None if it is not finished yet. A bare token ends
+    at the next top-level ',' or ']'.
+    """
+    depth = 0
+    quote = None
+    i = pos
+    while i < len(text):
+        c = text[i]
+        if quote:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+                if depth == 0:
+                    return i + 1
+        elif c in "\"'“":
+            quote = "”" if c == "“" else c
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            if depth == 0:
+                return i if c == "]" else i + 1
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif c == "," and depth == 0:
+            return i
+        i += 1
+    return None
+
+
+def repair_element(fragment):
+    """
+    (value, rule) for one list element that is not valid JSON, or None.
+    Rules, tried in order: smart quotes and trailing commas ('json_syntax'),
+    single quotes / Python literals ('python_literal'), unquoted keys
+    ('unquoted_keys').
+    """
+    text = _TRAILING_COMMA_RE.sub(r"\1", fragment.strip().translate(_SMART_QUOTES))
+    try:
+        return json.loads(text), "json_syntax"
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text), "python_literal"
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+    try:
+        return json.loads(_UNQUOTED_KEY_RE.sub(r'\1"\2":', text)), "unquoted_keys"
+    except ValueError:
+        return None
+
+
+# --- 2. Schema Checks ---
+def _level(value):
+    """Heading level as an int, or None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def check_section(value, variant):
+    """
+    (section, rule) for a parsed list element, rule naming the coercion
+    applied (None if it was already valid); (None, reason) if unusable.
+    """
+    if variant == FLAT:
+        if isinstance(value, str):
+            return (value, None) if value.strip() else (None, "empty_title")
+        if isinstance(value, dict) and isinstance(value.get("title"), str) and value["title"].strip():
+            return value["title"], "object_section"
+        return None, "not_a_title"
+
+    if isinstance(value, str):
+        return ({"title": value, "level": 1}, "string_section") if value.strip() else (None, "empty_title")
+    if not isinstance(value, dict):
+        return None, "not_an_object"
+    title = value.get("title")
+    if not isinstance(title, str) or not title.strip():
+        return None, "missing_title"
+    if "level" not in value:
+        return {**value, "level": 1}, "default_level"
+    level = _level(value["level"])
+    if level is None:
+        return {**value, "level": 1}, "invalid_level"
+    if not 1 <= level <= MAX_LEVEL:
+        return {**value, "level": min(max(level, 1), MAX_LEVEL)}, "level_range"
+    if type(value["level"]) is not int:
+        return {**value, "level": level}, "level_type"
+    return value, None
+
+
+# --- 3. Incremental Parser ---
+class OutlineParser:
+    """
+    Pulls the outline list out of a model reply that may arrive in chunks.
+    feed() returns the sections completed by the new text, close() the
+    rest. Each element is decoded with JSONDecoder.raw_decode; one that is
+    not valid JSON gets the repair rules, and one that fails them or the
+    schema check is skipped rather than failing the outline. A reply cut
+    off mid-list keeps the sections finished before the cut.
+
+        parser = OutlineParser(STRUCTURED)
+        for chunk in stream:
+            for section in parser.feed(chunk.content):
+                ...
+        parser.close()
+
+    repairs lists the rules applied, skipped the reasons elements were
+    dropped; complete is True once the closing ']' was seen.
+    """
+
+    def __init__(self, variant=STRUCTURED):
+        self.variant = variant
+        self.sections = []
+        self.repairs = []
+        self.skipped = []
+        self.complete = False
+        self._text = ""
+        self._pos = 0
+        self._in_list = False
+        self._closed = False
+
+    @property
+    def text(self):
+        return self._text
+
+    def feed(self, text):
+        if self._closed:
+            raise ValueError("feed() after close()")
+        self._text += text
+        return self._advance(final=False)
+
+    def close(self):
+        """Returns the last sections; raises OutlineError if the reply had none."""
+        if self._closed:
+            return []
+        self._closed = True
+        new = self._advance(final=True)
+        if not self._in_list:
+            raise OutlineError("The reply contains no JSON list.", self._text)
+        if not self.complete:
+            self.repairs.append("truncated")
+        if not self.sections:
+            reasons = ", ".join(sorted(set(self.skipped))) or "empty list"
+            raise OutlineError(f"The outline has no usable sections ({reasons}).", self._text)
+        return new
+
+    def _advance(self, final):
+        new = []
+        text = self._text
+        if not self._in_list:
+            match = _ARRAY_START_RE.search(text, self._pos)
+            if match is None:
+                self._pos = len(text)
+                return new
+            if match.end() == len(text.rstrip()) and not final:
+                # Nothing after the '[' yet: the next chunk decides what it opens
+                self._pos = match.start()
+                return new
+            self._in_list = True
+            self._pos = match.end()
+
+        pos = self._pos
+        while not self.complete:
+            # Separators; a missing comma between elements is tolerated
+            while pos < len(text) and (text[pos].isspace() or text[pos] == ","):
+                pos += 1
+            if pos >= len(text):
+                break
+            if text[pos] == "]":
+                self.complete = True
+                pos += 1
+                break
+            try:
+                value, end = _decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                end = _element_end(text, pos)
+                if end is None:
+                    break  # unfinished element; a truncated one is dropped on close
+                end = max(end, pos + 1)
+                repaired = repair_element(text[pos:end])
+                if repaired is None:
+                    self.skipped.append("invalid_json")
+                    pos = end
+                    continue
+                value, rule = repaired
+                self.repairs.append(rule)
+            else:
+                if end == len(text) and not final and not isinstance(value, (dict, list, str)):
+                    break  # a bare number or literal may still be growing
+            section, rule = check_section(value, self.variant)
+            if section is None:
+                self.skipped.append(rule)
+            else:
+                if rule is not None:
+                    self.repairs.append(rule)
+                self.sections.append(section)
+                new.append(section)
+            pos = end
+        self._pos = pos
+        return new
+
+
+def parse_outline(raw_content, variant=STRUCTURED):
+    """Parses a complete reply; returns the OutlineParser (sections, repairs, ...)."""
+    parser = OutlineParser(variant)
+    parser.feed(raw_content)
+    parser.close()
+    return parser
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from langchain_core.messages import HumanMessage
+
+from .outline_parser import FLAT, STRUCTURED, OutlineError, parse_outline
+from .text_extraction import extract_text
+
+logger = logging.getLogger(__name__)
+
+# Parsed outlines, keyed by a fingerprint of the sample strategy text.
+# Unlike the response cache there is no TTL: template strategies rarely change
+# and a changed document gets a new fingerprint anyway.
+OUTLINE_STORE_PATH = os.environ.get("OUTLINE_STORE_PATH", "outline_store.sqlite3")
+
+SAMPLE_EXTENSIONS = ('.docx', '.md', '.txt')
+
+
+# --- Outline Prompts ---
+def flat_outline_prompt(sample_strat):
+    return (
+        f"Analyze this Sample Strategy:\n{sample_strat}\n\n"
+        "Extract the high-level Section Headers used in this document. "
+        "Return ONLY a JSON list of strings. "
+        "Do not write any introductory text. "
+        "Example: [\"1. Scope\", \"2. Risk Analysis\", \"3. Test Approach\"]"
+    )
+
+
+def structured_outline_prompt(sample_strat):
+    return (
+        f"Analyze this Sample Strategy:\n{sample_strat}\n\n"
+        "Extract the Section Headers and Sub-headers used in this document to create a skeletal outline. "
+        "Return ONLY a JSON list of objects. Each object must have two keys:\n"
+        "1. 'title': The text of the header (remove numbering like 1, 1.1, etc.)\n"
+        "2. 'level': An integer representing the hierarchy (1 for Main Header, 2 for Sub-header, 3 for sub-sub-header).\n\n"
+        "Example Output format:\n"
+        "[\n"
+        "  {\"title\": \"Scope\", \"level\": 1},\n"
+        "  {\"title\": \"In Scope\", \"level\": 2},\n"
+        "  {\"title\": \"Out of Scope\", \"level\": 2},\n"
+        "  {\"title\": \"Risk Analysis\", \"level\": 1}\n"
+        "]"
+    )
+
+
+OUTLINE_PROMPTS = {
+    FLAT: flat_outline_prompt,
+    STRUCTURED: structured_outline_prompt,
+}
+
+
+# --- Fingerprinting ---
+def normalize(text):
+    """Whitespace and line-ending differences must not produce a new outline."""
+    return " ".join(text.split())
+
+
+def fingerprint(sample_strat):
+    return hashlib.sha256(normalize(sample_strat).encode("utf-8")).hexdigest()
+
+
+class OutlineStore:
+    """SQLite store of parsed outlines per (sample strategy fingerprint, variant)."""
+
+    def __init__(self, path=OUTLINE_STORE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outlines ("
+            " fingerprint TEXT NOT NULL,"
+            " variant TEXT NOT NULL,"
+            " sections TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " PRIMARY KEY (fingerprint, variant))"
+        )
+        self._conn.commit()
+
+    def get(self, sample_strat, variant):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sections FROM outlines WHERE fingerprint = ? AND variant = ?",
+                (fingerprint(sample_strat), variant),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, sample_strat, variant, sections):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outlines (fingerprint, variant, sections, created) VALUES (?, ?, ?, ?)",
+                (fingerprint(sample_strat), variant, json.dumps(sections), time.time()),
+            )
+            self._conn.commit()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_outline_store():
+    """Process-wide OutlineStore at OUTLINE_STORE_PATH."""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = OutlineStore()
+    return _default_store
+
+
+def _parse_timed(raw_content, variant, metrics):
+    if metrics is None:
+        outline = parse_outline(raw_content, variant)
+    else:
+        with metrics.span("outline_parse"):
+            outline = parse_outline(raw_content, variant)
+    _report(outline, metrics)
+    return outline
+
+
+def _report(outline, metrics):
+    """Logs and counts what the tolerant parser had to repair or drop."""
+    if outline.repairs or outline.skipped:
+        logger.warning("Outline reply repaired (%s), %d element(s) dropped (%s)",
+                       ", ".join(outline.repairs), len(outline.skipped), ", ".join(outline.skipped))
+    if metrics is not None:
+        metrics.incr("outline_repairs", len(outline.repairs))
+        metrics.incr("outline_skipped", len(outline.skipped))
+        if not outline.complete:
+            metrics.incr("outline_truncated")
+
+
+def generate_outline(chat, sample_strat, variant, metrics=None):
+    """
+    Runs the outline call in one request (the generators stream it, see
+    stream_outline). Returns the OutlineParser (sections, text, complete,
+    ...); raises OutlineError when the reply has no usable section. Only a
+    complete outline should be stored.
+    """
+    prompt = OUTLINE_PROMPTS[variant](sample_strat)
+    response = chat.invoke([HumanMessage(content=prompt)])
+    return _parse_timed(response.content.strip(), variant, metrics)
+
+
+def _feed(outline, text, final=False):
+    """outline.feed(text) (or close()), returning (new sections, seconds spent parsing)."""
+    start = time.perf_counter()
+    sections = outline.close() if final else outline.feed(text)
+    return sections, time.perf_counter() - start
+
+
+def _finish(outline, parse_seconds, metrics):
+    if metrics is not None:
+        metrics.record("outline_parse", parse_seconds)
+    _report(outline, metrics)
+
+
+def stream_outline(chat, sample_strat, outline, metrics=None):
+    """
+    The outline call streamed: yields each section as soon as the reply
+    completes it, so its generation can start while the rest of the
+    outline is still arriving. outline is an OutlineParser for the
+    variant; afterwards it holds sections, text and complete. Raises
+    OutlineError at the end when the reply has no usable section.
+    """
+    prompt = OUTLINE_PROMPTS[outline.variant](sample_strat)
+    parse_seconds = 0.0
+    for chunk in chat.stream([HumanMessage(content=prompt)]):
+        sections, seconds = _feed(outline, chunk.content)
+        parse_seconds += seconds
+        yield from sections
+    sections, seconds = _feed(outline, "", final=True)
+    _finish(outline, parse_seconds + seconds, metrics)
+    yield from sections
+
+
+async def astream_outline(chat, sample_strat, outline, metrics=None):
+    """stream_outline via chat.astream, for the async generators."""
+    prompt = OUTLINE_PROMPTS[outline.variant](sample_strat)
+    parse_seconds = 0.0
+    async for chunk in chat.astream([HumanMessage(content=prompt)]):
+        sections, seconds = _feed(outline, chunk.content)
+        parse_seconds += seconds
+        for section in sections:
+            yield section
+    sections, seconds = _feed(outline, "", final=True)
+    _finish(outline, parse_seconds + seconds, metrics)
+    for section in sections:
+        yield section
+
+
+# --- Pre-warming (used by the prewarm_outlines management command) ---
+def _read_sample(path):
+    with open(path, 'rb') as f:
+        return extract_text(f)
+
+
+def prewarm_directory(directory, chat, store=None, variants=(FLAT, STRUCTURED), force=False):
+    """
+    Generates and stores outlines for every sample strategy in a directory.
+    Yields (filename, variant, status) so callers can report progress.
+    """
+    store = store or get_outline_store()
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(SAMPLE_EXTENSIONS):
+            continue
+        sample_strat = _read_sample(os.path.join(directory, name))
+        for variant in variants:
+            if not force and store.get(sample_strat, variant) is not None:
+                yield name, variant, "cached"
+                continue
+            try:
+                outline = generate_outline(chat, sample_strat, variant)
+            except OutlineError as e:
+                yield name, variant, f"failed: {e}"
+                continue
+            if not outline.complete:
+                yield name, variant, f"failed: truncated reply ({len(outline.sections)} sections)"
+                continue
+            store.put(sample_strat, variant, outline.sections)
+            yield name, variant, f"stored {len(outline.sections)} sections"
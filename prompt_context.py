@@ -0,0 +1,211 @@
+import asyncio
+import threading
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from .llm_cache import is_cache_hit
+
+# Mark the shared STYLE REFERENCE / INPUT REQUIREMENT prefix as cacheable.
+# Bedrock then only processes it in full on the first section call of a
+# request; the remaining calls read it from the prompt cache.
+PROMPT_CACHING = True
+
+# Bedrock models that accept cache_control blocks. Others (e.g. Claude 3
+# Sonnet, the DEFAULT_MODEL_ID) get a plain system message and no warmup
+# wait: the prefix could not be cached, and some reject the extra field.
+# Cross-region inference profile ids ("us.anthropic...") match too.
+PROMPT_CACHING_MODELS = frozenset({
+    "anthropic.claude-3-5-haiku-20241022-v1:0",
+    "anthropic.claude-3-7-sonnet-20250219-v1:0",
+    "anthropic.claude-sonnet-4-20250514-v1:0",
+    "anthropic.claude-opus-4-20250514-v1:0",
+    "anthropic.claude-opus-4-1-20250805-v1:0",
+    "anthropic.claude-sonnet-4-5-20250929-v1:0",
+    "anthropic.claude-haiku-4-5-20251001-v1:0",
+})
+_PROFILE_PREFIXES = ("us.", "eu.", "apac.", "global.")
+
+# Section calls run in parallel, but the cache entry only exists once the
+# first call has processed the prefix. The other workers wait (up to this
+# many seconds) for the first call's first token before sending theirs.
+PREFIX_WARMUP_TIMEOUT = 30
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) used when the API reports nothing."""
+    return len(text) // 4
+
+
+def prompt_caching_enabled(model_id):
+    """True if the shared prefix should be sent as cacheable to model_id."""
+    if not PROMPT_CACHING:
+        return False
+    for prefix in _PROFILE_PREFIXES:
+        if model_id.startswith(prefix):
+            model_id = model_id[len(prefix):]
+            break
+    return model_id in PROMPT_CACHING_MODELS
+
+
+def build_shared_context(sample_strat, target_drs, cache=PROMPT_CACHING):
+    """
+    Builds the part of every section prompt that does not change between
+    sections, ONCE per request, as a system message. target_drs=None leaves
+    the requirement out (each section then gets its excerpts, see drs_index).
+    """
+    prefix = (
+        f"You are writing a Test Strategy. \n"
+        f"STYLE REFERENCE: {sample_strat}\n"
+    )
+    if target_drs is not None:
+        prefix += f"INPUT REQUIREMENT: {target_drs}\n"
+    if not cache:
+        return SystemMessage(content=prefix)
+
+    return SystemMessage(content=[
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+    ])
+
+
+def section_task(title, requirements=None):
+    """The only per-section part of the prompt, with this section's DRS excerpts if given."""
+    excerpts = f"INPUT REQUIREMENT (excerpts relevant to this section):\n{requirements}\n\n" if requirements else ""
+    return HumanMessage(content=(
+        f"{excerpts}"
+        f"TASK: Write ONLY the content for the section: '{title}'. "
+        "Do not include the section header itself in the output, just the body text. "
+        "Maintain the exact tone and formatting of the Style Reference."
+    ))
+
+
+def _message_text(message):
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(block.get("text", "") for block in message.content)
+
+
+class TokenReport:
+    """
+    Collects input-token usage for the section calls of one request, so the
+    saving from the shared prefix can be shown to the user. Thread-safe:
+    section workers report into the same instance.
+    """
+
+    def __init__(self, shared_context, cache=PROMPT_CACHING):
+        self.shared_tokens = estimate_tokens(_message_text(shared_context))
+        self.cache = cache
+        self.prefix_ready = threading.Event()
+        self._prefix_ready_async = None
+        self._warmup_claimed = False
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.by_section = {}  # label -> [input_tokens, output_tokens]
+        self._lock = threading.Lock()
+
+    def add_usage(self, message, label=None):
+        """Records usage_metadata from an AIMessage / final AIMessageChunk."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        details = usage.get("input_token_details") or {}
+        with self._lock:
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.output_tokens += usage.get("output_tokens", 0)
+            if label is not None:
+                section = self.by_section.setdefault(label, [0, 0])
+                section[0] += usage.get("input_tokens", 0)
+                section[1] += usage.get("output_tokens", 0)
+            self.cache_read_tokens += details.get("cache_read", 0)
+            self.cache_write_tokens += details.get("cache_creation", 0)
+
+    def count_call(self, message):
+        """Counts the model call behind message (a reply or its first chunk); response-cache hits are not calls."""
+        if is_cache_hit(message):
+            return
+        with self._lock:
+            self.calls += 1
+
+    def _claim_warmup(self):
+        """True for the one caller that goes first (and writes the prefix to the cache)."""
+        with self._lock:
+            first = not self._warmup_claimed
+            self._warmup_claimed = True
+        return first
+
+    def wait_for_prefix(self):
+        """
+        Lets the first section call through immediately and holds the others
+        until it has written the prefix to the cache (or the timeout passes).
+        """
+        if self.cache and not self._claim_warmup():
+            self.prefix_ready.wait(PREFIX_WARMUP_TIMEOUT)
+
+    def set_prefix_ready(self):
+        self.prefix_ready.set()
+        if self._prefix_ready_async is not None:
+            self._prefix_ready_async.set()
+
+    async def await_prefix(self):
+        """wait_for_prefix for coroutines; waits on an asyncio.Event so the loop stays free."""
+        if not self.cache or self._claim_warmup():
+            return
+        if self._prefix_ready_async is None:
+            self._prefix_ready_async = asyncio.Event()
+            if self.prefix_ready.is_set():
+                self._prefix_ready_async.set()
+        try:
+            await asyncio.wait_for(self._prefix_ready_async.wait(), PREFIX_WARMUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+    def _track(self, chunk, label, first):
+        if first:
+            self.count_call(chunk)
+        self.set_prefix_ready()
+        if getattr(chunk, "usage_metadata", None):
+            self.add_usage(chunk, label)
+        return chunk.content
+
+    def track_stream(self, chunks, label=None):
+        """Passes chunk text through while picking up usage (per label, if given) from the stream."""
+        first = True
+        try:
+            for chunk in chunks:
+                yield self._track(chunk, label, first)
+                first = False
+        finally:
+            self.set_prefix_ready()
+
+    async def atrack_stream(self, chunks, label=None):
+        """track_stream for an async chunk iterator (ChatBedrock.astream)."""
+        first = True
+        try:
+            async for chunk in chunks:
+                yield self._track(chunk, label, first)
+                first = False
+        finally:
+            self.set_prefix_ready()
+
+    def summary(self):
+        # Without a shared prefix every call would re-send (and re-process) it.
+        resent_without_cache = self.shared_tokens * max(self.calls - 1, 0)
+        if not self.calls:
+            return "Prompt cache: every section was answered from the response cache, no model calls."
+        if not self.cache:
+            return (
+                f"Prompt cache: not supported by this model "
+                f"(shared context ~{self.shared_tokens} tokens, "
+                f"~{resent_without_cache} tokens re-processed across {self.calls} section calls)."
+            )
+        if self.cache_read_tokens:
+            return (
+                f"Prompt cache: {self.cache_read_tokens} of {self.input_tokens} input tokens "
+                f"read from cache across {self.calls} section calls "
+                f"(shared context ~{self.shared_tokens} tokens)."
+            )
+        return (
+            f"Prompt cache: no cache reads reported by the model "
+            f"(shared context ~{self.shared_tokens} tokens, "
+            f"~{resent_without_cache} tokens re-processed across {self.calls} section calls)."
+        )
@@ -0,0 +1,341 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+from .bedrock_client import DEFAULT_MODEL_ID
+
+logger = logging.getLogger(__name__)
+
+# Account quota per model id, in requests per minute. Calls are paced by a
+# token bucket so a burst of sections from several users stays under it.
+# Models not listed are not paced; only the AIMD limit below applies.
+MODEL_REQUESTS_PER_MINUTE = {
+    DEFAULT_MODEL_ID: int(os.environ.get("BEDROCK_REQUESTS_PER_MINUTE", "200")),
+}
+BURST_SECONDS = 10  # the bucket holds this many seconds' worth of requests
+
+# AIMD concurrency per model: unlimited until Bedrock first throttles,
+# then halved on throttling and raised by ~1 per limit's worth of
+# successful calls, up to MAX_CONCURRENCY. Only calls started after the
+# last decrease can decrease it again, so one overload halves it once.
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 64
+DECREASE_FACTOR = 0.5
+
+# Jittered exponential backoff ("full jitter") for throttled calls.
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5   # seconds
+BACKOFF_MAX = 20.0   # seconds
+
+# Error codes worth retrying: throttling and transient service trouble.
+# botocore's own retries are turned off for the governed client
+# (bedrock_client), so these reach the governor immediately.
+THROTTLING_CODES = frozenset({"ThrottlingException", "TooManyRequestsException"})
+TRANSIENT_CODES = frozenset({
+    "ServiceUnavailableException", "ModelNotReadyException", "InternalServerException",
+    "EndpointConnectionError", "ConnectionClosedError",
+})
+
+
+def error_code(exc):
+    """Bedrock error code of exc or of any exception it wraps (langchain re-raises), else None."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        code = (getattr(exc, "response", None) or {}).get("Error", {}).get("Code")
+        if code:
+            return code
+        name = type(exc).__name__
+        if name in THROTTLING_CODES or name in TRANSIENT_CODES:
+            return name
+        for code in THROTTLING_CODES:
+            if code in str(exc):
+                return code
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def backoff_delay(attempt):
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+# --- 1. Token Bucket ---
+class TokenBucket:
+    """
+    Requests-per-second pacing. reserve() books the next slot and returns
+    how long the caller must wait for it, so threads and coroutines share
+    one bucket without holding the lock while they sleep.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # Negative tokens are slots already promised to earlier callers
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+# --- 2. AIMD Concurrency Limit ---
+class AimdLimit:
+    """
+    Concurrency limit for calls to one model, shared by threads and event
+    loops. limit is None (unlimited) until the first throttle.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+        self._async_waiters = set()  # (loop, asyncio.Event)
+
+    def _try_acquire(self):
+        with self._cond:
+            if self.limit is None or self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        """Blocks for a slot; returns the time it was granted (for on_throttle)."""
+        with self._cond:
+            while self.limit is not None and self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        while not self._try_acquire():
+            waiter = (loop, asyncio.Event())
+            with self._cond:
+                self._async_waiters.add(waiter)
+            try:
+                # A slot may have freed between the check and registering
+                if self._try_acquire():
+                    break
+                await waiter[1].wait()
+            finally:
+                with self._cond:
+                    self._async_waiters.discard(waiter)
+        return time.monotonic()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._wake()
+
+    def _wake(self):
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def on_success(self):
+        with self._cond:
+            if self.limit is not None and self.limit < MAX_CONCURRENCY:
+                self.limit = min(MAX_CONCURRENCY, self.limit + 1 / self.limit)
+                self._wake()
+
+    def on_throttle(self, started):
+        """Multiplicative decrease for a call granted at started; True if the limit changed."""
+        with self._cond:
+            if started < self._last_decrease:
+                return False  # sent before the last decrease took effect
+            current = self.limit if self.limit is not None else min(self.in_flight, MAX_CONCURRENCY)
+            self.limit = max(MIN_CONCURRENCY, current * DECREASE_FACTOR)
+            self._last_decrease = time.monotonic()
+            return True
+
+
+# --- 3. Governor ---
+class RateGovernor:
+    """
+    Client-side governor for one model: token-bucket pacing to the quota,
+    an AIMD concurrency limit driven by throttling responses, and jittered
+    retries. Shared by every request in the process (get_governor).
+    """
+
+    def __init__(self, model_id, requests_per_minute=None):
+        self.model_id = model_id
+        self.bucket = None
+        if requests_per_minute:
+            rate = requests_per_minute / 60
+            self.bucket = TokenBucket(rate, max(1.0, rate * BURST_SECONDS))
+        self.concurrency = AimdLimit()
+
+    def _retry_delay(self, exc, attempt, started, metrics):
+        """Seconds to wait before retrying exc, or None to give up and raise it."""
+        code = error_code(exc)
+        if code not in THROTTLING_CODES and code not in TRANSIENT_CODES:
+            return None
+        if code in THROTTLING_CODES:
+            if self.concurrency.on_throttle(started):
+                logger.warning("Bedrock throttled %s; concurrency limit now %.1f",
+                               self.model_id, self.concurrency.limit)
+            if metrics is not None:
+                metrics.incr("throttles")
+        if attempt >= MAX_RETRIES:
+            return None
+        if metrics is not None:
+            metrics.incr("retries")
+        return backoff_delay(attempt)
+
+    def _pace(self):
+        """Waits for this call's slot in the token bucket (no-op for unpaced models)."""
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+            if delay:
+                time.sleep(delay)
+
+    async def _apace(self):
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+            if delay:
+                await asyncio.sleep(delay)
+
+    # --- sync ---
+    def call(self, func, *args, metrics=None):
+        attempt = 0
+        while True:
+            started = self.concurrency.acquire()
+            try:
+                self._pace()
+                result = func(*args)
+                self.concurrency.on_success()
+                return result
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started, metrics)
+                if delay is None:
+                    raise
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+            attempt += 1
+
+    def stream(self, func, *args, metrics=None):
+        """
+        Iterates func(*args) under the governor. The concurrency slot is held
+        for the whole stream; only a stream that fails before its first chunk
+        is retried (the caller has seen nothing yet).
+        """
+        attempt = 0
+        while True:
+            started = self.concurrency.acquire()
+            yielded = False
+            try:
+                self._pace()
+                for chunk in func(*args):
+                    yielded = True
+                    yield chunk
+                self.concurrency.on_success()
+                return
+            except Exception as e:
+                delay = None if yielded else self._retry_delay(e, attempt, started, metrics)
+                if delay is None:
+                    raise
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+            attempt += 1
+
+    # --- async ---
+    async def acall(self, func, *args, metrics=None):
+        attempt = 0
+        while True:
+            started = await self.concurrency.aacquire()
+            try:
+                await self._apace()
+                result = await func(*args)
+                self.concurrency.on_success()
+                return result
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started, metrics)
+                if delay is None:
+                    raise
+            finally:
+                self.concurrency.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def astream(self, func, *args, metrics=None):
+        attempt = 0
+        while True:
+            started = await self.concurrency.aacquire()
+            yielded = False
+            try:
+                await self._apace()
+                async for chunk in func(*args):
+                    yielded = True
+                    yield chunk
+                self.concurrency.on_success()
+                return
+            except Exception as e:
+                delay = None if yielded else self._retry_delay(e, attempt, started, metrics)
+                if delay is None:
+                    raise
+            finally:
+                self.concurrency.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(model_id):
+    """Process-wide RateGovernor for a model id, sized from MODEL_REQUESTS_PER_MINUTE."""
+    governor = _governors.get(model_id)
+    if governor is None:
+        with _governors_lock:
+            governor = _governors.get(model_id)
+            if governor is None:
+                governor = RateGovernor(model_id, MODEL_REQUESTS_PER_MINUTE.get(model_id))
+                _governors[model_id] = governor
+    return governor
+
+
+# --- 4. Chat Wrapper ---
+class GovernedChat:
+    """
+    Wraps a ChatBedrock (or CachedChat-compatible chat) so every call goes
+    through the model's RateGovernor; throttles and retries are counted on
+    the optional RunMetrics.
+    """
+
+    def __init__(self, chat, governor=None, metrics=None):
+        self.chat = chat
+        self.governor = governor or get_governor(chat.model_id)
+        self.metrics = metrics
+
+    @property
+    def model_id(self):
+        return self.chat.model_id
+
+    @property
+    def model_kwargs(self):
+        return self.chat.model_kwargs
+
+    def invoke(self, messages):
+        return self.governor.call(self.chat.invoke, messages, metrics=self.metrics)
+
+    def stream(self, messages):
+        return self.governor.stream(self.chat.stream, messages, metrics=self.metrics)
+
+    async def ainvoke(self, messages):
+        return await self.governor.acall(self.chat.ainvoke, messages, metrics=self.metrics)
+
+    def astream(self, messages):
+        return self.governor.astream(self.chat.astream, messages, metrics=self.metrics)
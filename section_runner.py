@@ -0,0 +1,230 @@
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import time
+
+logger = logging.getLogger(__name__)
+
+# How many section prompts are sent to Bedrock at the same time.
+# 1 keeps the old one-after-another behaviour.
+SECTION_CONCURRENCY = 4
+
+# Token coalescing: small model chunks are merged server-side and only
+# handed to the HTTP stream once we have this many characters or the
+# oldest buffered token has waited this long (seconds).
+STREAM_MIN_CHARS = 200
+STREAM_MAX_DELAY = 0.15
+
+_DONE = object()
+
+
+class SectionStream:
+    """
+    Text of one section, filled by a worker thread and drained by the
+    response generator. Iterating yields coalesced chunks as they arrive;
+    .text holds the full body once iteration is finished.
+    """
+
+    def __init__(self, min_chars=STREAM_MIN_CHARS, max_delay=STREAM_MAX_DELAY):
+        self.min_chars = min_chars
+        self.max_delay = max_delay
+        self.started_at = None
+        self.first_token_at = None
+        self.last_token_at = None
+        self._parts = []
+        self._buffer = []
+        self._buffered = 0
+        self._buffer_since = None
+        self._queue = self._make_queue()
+
+    def _make_queue(self):
+        return queue.Queue()
+
+    # --- Coalescing ---
+    def _add(self, chunk):
+        """Records a chunk; returns the coalesced text once it is due, else None."""
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self.last_token_at = now
+        self._parts.append(chunk)
+
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffer_since is None:
+            self._buffer_since = now
+        if self._buffered >= self.min_chars or now - self._buffer_since >= self.max_delay:
+            return self._take()
+        return None
+
+    def _take(self):
+        text = "".join(self._buffer)
+        self._buffer, self._buffered, self._buffer_since = [], 0, None
+        return text
+
+    # --- Producer side (worker thread) ---
+    def run(self, func, *args):
+        """Calls func(*args), coalesces the chunks it returns and queues them for the reader."""
+        self.started_at = time.perf_counter()
+        try:
+            for chunk in func(*args):
+                if chunk:
+                    text = self._add(chunk)
+                    if text is not None:
+                        self._queue.put(text)
+            if self._buffer:
+                self._queue.put(self._take())
+            self._queue.put(_DONE)
+        except BaseException as e:
+            self._queue.put(e)
+            raise
+
+    # --- Consumer side (response generator) ---
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    @property
+    def first_token_latency(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def last_token_latency(self):
+        if self.last_token_at is None:
+            return None
+        return self.last_token_at - self.started_at
+
+
+class SectionPipeline:
+    """
+    Runs func(item) (an iterable of text chunks, e.g. ChatBedrock.stream)
+    on a bounded thread pool for items that arrive over time, e.g. sections
+    parsed from an outline that is still streaming: add(item) starts it at
+    once, iterating yields (item, SectionStream) in add() order, so the head
+    section streams token by token while later ones are buffering. Iteration ends when it has caught up with add(), so finish
+    adding first. Stopping iteration early (client disconnect, failed
+    section) or close() cancels the sections not started yet.
+    """
+
+    def __init__(self, func, max_workers=SECTION_CONCURRENCY):
+        self._func = func
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers or 1)), thread_name_prefix="section"
+        )
+        self._items = []
+
+    def add(self, item):
+        stream = SectionStream()
+        self._executor.submit(stream.run, self._func, item)
+        self._items.append((item, stream))
+        return stream
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        try:
+            for item, stream in self._items:
+                yield item, stream
+                logger.info(
+                    "section %r: first token %.2fs, last token %.2fs",
+                    item, stream.first_token_latency or 0.0, stream.last_token_latency or 0.0,
+                )
+        finally:
+            self.close()
+
+    def close(self):
+        # Don't keep paying for sections nobody will read
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- asyncio variants (ASGI) ---
+class AsyncSectionStream(SectionStream):
+    """SectionStream filled by a task on the event loop instead of a worker thread."""
+
+    def _make_queue(self):
+        return asyncio.Queue()
+
+    async def arun(self, func, *args):
+        """Like run(), but func(*args) returns an async iterable of text chunks."""
+        self.started_at = time.perf_counter()
+        try:
+            async for chunk in func(*args):
+                if chunk:
+                    text = self._add(chunk)
+                    if text is not None:
+                        self._queue.put_nowait(text)
+            if self._buffer:
+                self._queue.put_nowait(self._take())
+            self._queue.put_nowait(_DONE)
+        except Exception as e:
+            # Handed to the reader instead of being lost in the task
+            self._queue.put_nowait(e)
+
+    def __iter__(self):
+        raise TypeError("AsyncSectionStream is read with 'async for'")
+
+    async def __aiter__(self):
+        while True:
+            item = await self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+class AsyncSectionPipeline:
+    """
+    SectionPipeline for coroutines: add(item) starts func(item) (an async
+    iterable of text chunks) as a task on the current event loop, at most
+    max_workers at once; 'async for' yields (item, AsyncSectionStream) in
+    add() order.
+    """
+
+    def __init__(self, func, max_workers=SECTION_CONCURRENCY):
+        self._func = func
+        self._limit = asyncio.Semaphore(max(1, int(max_workers or 1)))
+        self._items = []
+        self._tasks = []
+
+    async def _fill(self, item, stream):
+        async with self._limit:
+            await stream.arun(self._func, item)
+
+    def add(self, item):
+        stream = AsyncSectionStream()
+        self._tasks.append(asyncio.ensure_future(self._fill(item, stream)))
+        self._items.append((item, stream))
+        return stream
+
+    def __len__(self):
+        return len(self._items)
+
+    async def __aiter__(self):
+        try:
+            for item, stream in self._items:
+                yield item, stream
+                logger.info(
+                    "section %r: first token %.2fs, last token %.2fs",
+                    item, stream.first_token_latency or 0.0, stream.last_token_latency or 0.0,
+                )
+        finally:
+            self.close()
+
+    def close(self):
+        # Client disconnected or a section failed: stop the remaining calls
+        for task in self._tasks:
+            task.cancel()
@@ -0,0 +1,264 @@
+import asyncio
+import threading
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from .llm_cache import cache_key
+
+
+# --- 1. In-Flight Calls ---
+class Flight:
+    """
+    One model call and everything it has produced so far. The producer
+    (a pump thread or task) appends chunks; any number of readers, threads
+    or coroutines, replay them from the start and then follow live.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.readers = 0
+        self.cancelled = False
+        self.task = None  # asyncio producer, cancelled when every reader has left
+        self._cond = threading.Condition()
+        self._async_waiters = set()  # (loop, asyncio.Event)
+
+    def publish(self, chunk):
+        with self._cond:
+            self.chunks.append(chunk)
+            self._wake()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._wake()
+
+    def _wake(self):
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def _next(self, i):
+        """(new chunks from i, finished) without waiting."""
+        with self._cond:
+            return self.chunks[i:], self.done
+
+    def read(self):
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self.chunks) and not self.done:
+                    self._cond.wait()
+            batch, done = self._next(i)
+            i += len(batch)
+            yield from batch
+            if done and not batch:
+                if self.error is not None:
+                    raise self.error
+                return
+
+    async def aread(self):
+        loop = asyncio.get_running_loop()
+        i = 0
+        while True:
+            batch, done = self._next(i)
+            if not batch and not done:
+                waiter = (loop, asyncio.Event())
+                with self._cond:
+                    self._async_waiters.add(waiter)
+                try:
+                    # Anything published between the check and registering
+                    batch, done = self._next(i)
+                    if not batch and not done:
+                        await waiter[1].wait()
+                        continue
+                finally:
+                    with self._cond:
+                        self._async_waiters.discard(waiter)
+            i += len(batch)
+            for chunk in batch:
+                yield chunk
+            if done and not batch:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class FlightGroup:
+    """
+    Process-wide map of in-flight calls by prompt key. The first requester
+    of a key starts the call (leader); later ones attach to it. A finished
+    flight leaves the map, so a later identical prompt is a new call (or a
+    response-cache hit).
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """Returns (flight, is_leader) and counts the caller as a reader."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+            flight.readers += 1
+        return flight, leader
+
+    def complete(self, key, flight, error=None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.finish(error)
+
+    def leave(self, key, flight):
+        """A reader is done; the call is stopped once nobody is left to read it."""
+        with self._lock:
+            flight.readers -= 1
+            abandoned = flight.readers == 0 and not flight.done
+            if abandoned and self._flights.get(key) is flight:
+                del self._flights[key]
+        if abandoned:
+            flight.cancelled = True
+            if flight.task is not None:
+                flight.task.get_loop().call_soon_threadsafe(flight.task.cancel)
+
+    def __len__(self):
+        return len(self._flights)
+
+
+_group = FlightGroup()
+
+
+def get_flight_group():
+    return _group
+
+
+# --- 2. Chat Wrapper ---
+def _shared(chunk, leader):
+    """Followers get the text only: the usage metadata belongs to the leader's run."""
+    return chunk if leader else AIMessageChunk(content=chunk.content)
+
+
+class SingleFlightChat:
+    """
+    Wraps a chat so identical prompts that are in flight at the same time
+    (a double-clicked Submit, several users uploading the same files) make
+    one model call. Later requesters attach to the running call and get the
+    same output, streamed as it arrives. Attached requests are counted as
+    "coalesced" on the optional RunMetrics.
+    """
+
+    def __init__(self, chat, metrics=None, group=None):
+        self.chat = chat
+        self.metrics = metrics
+        self.group = group or _group
+
+    @property
+    def model_id(self):
+        return self.chat.model_id
+
+    @property
+    def model_kwargs(self):
+        return self.chat.model_kwargs
+
+    def _join(self, kind, messages):
+        key = (kind, cache_key(self.model_id, self.model_kwargs, messages))
+        flight, leader = self.group.join(key)
+        if not leader and self.metrics is not None:
+            self.metrics.incr("coalesced")
+        return key, flight, leader
+
+    # --- sync ---
+    def invoke(self, messages):
+        key, flight, leader = self._join("invoke", messages)
+        try:
+            if leader:
+                try:
+                    response = self.chat.invoke(messages)
+                except Exception as e:
+                    self.group.complete(key, flight, e)
+                    raise
+                flight.publish(response)
+                self.group.complete(key, flight)
+                return response
+            response, = flight.read()
+            return AIMessage(content=response.content)
+        finally:
+            self.group.leave(key, flight)
+
+    def stream(self, messages):
+        key, flight, leader = self._join("stream", messages)
+        try:
+            if leader:
+                # The call runs on its own thread, so it carries on for the
+                # others if this requester disconnects
+                threading.Thread(
+                    target=self._pump, args=(key, flight, messages), daemon=True, name="single-flight"
+                ).start()
+            for chunk in flight.read():
+                yield _shared(chunk, leader)
+        finally:
+            self.group.leave(key, flight)
+
+    def _pump(self, key, flight, messages):
+        chunks = self.chat.stream(messages)
+        try:
+            for chunk in chunks:
+                if flight.cancelled:
+                    break
+                flight.publish(chunk)
+        except Exception as e:
+            self.group.complete(key, flight, e)
+            return
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        self.group.complete(key, flight)
+
+    # --- async ---
+    async def ainvoke(self, messages):
+        key, flight, leader = self._join("invoke", messages)
+        try:
+            if leader:
+                flight.task = asyncio.ensure_future(self._acall(key, flight, messages))
+            response, = [r async for r in flight.aread()]
+            return response if leader else AIMessage(content=response.content)
+        finally:
+            self.group.leave(key, flight)
+
+    async def _acall(self, key, flight, messages):
+        try:
+            response = await self.chat.ainvoke(messages)
+        except BaseException as e:
+            self.group.complete(key, flight, e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        flight.publish(response)
+        self.group.complete(key, flight)
+
+    async def astream(self, messages):
+        key, flight, leader = self._join("stream", messages)
+        try:
+            if leader:
+                flight.task = asyncio.ensure_future(self._apump(key, flight, messages))
+            async for chunk in flight.aread():
+                yield _shared(chunk, leader)
+        finally:
+            self.group.leave(key, flight)
+
+    async def _apump(self, key, flight, messages):
+        try:
+            async for chunk in self.chat.astream(messages):
+                flight.publish(chunk)
+        except BaseException as e:
+            self.group.complete(key, flight, e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        self.group.complete(key, flight)
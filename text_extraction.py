@@ -0,0 +1,129 @@
+import io
+import mmap
+import os
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Refuse uploads whose extracted text is larger than this (characters).
+# A text upload is checked by its byte size up front (UTF-8 never has
+# fewer bytes than characters), so an oversized one is never decoded.
+MAX_EXTRACT_CHARS = 20_000_000
+
+
+class ExtractionLimitError(ValueError):
+    """Raised when an upload's text exceeds the configured ceiling."""
+
+
+# --- .docx ---
+def _run_text(elem):
+    """Text of a w:p, the same way python-docx builds Paragraph.text."""
+    parts = []
+    for node in elem.iter():
+        tag = node.tag
+        if tag == W + 't':
+            parts.append(node.text or '')
+        elif tag == W + 'tab':
+            parts.append('\t')
+        elif tag in (W + 'br', W + 'cr'):
+            parts.append('\n')
+    return ''.join(parts)
+
+
+def _table_rows(tbl):
+    for tr in tbl.findall(W + 'tr'):
+        cells = []
+        for tc in tr.findall(W + 'tc'):
+            cells.append('\n'.join(_run_text(p) for p in tc.findall(W + 'p')))
+        yield '\t'.join(cells)
+
+
+def iter_docx_text(fileobj):
+    """
+    Yields the text of each body paragraph, and of each table row (cells
+    separated by tabs), straight from word/document.xml. Only one top-level
+    element is held in memory at a time.
+    """
+    with zipfile.ZipFile(fileobj) as package:
+        with package.open('word/document.xml') as xml_file:
+            depth = 0
+            body = None
+            body_depth = None
+            for event, elem in iterparse(xml_file, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if elem.tag == W + 'body':
+                        body, body_depth = elem, depth
+                    continue
+
+                if body is not None and depth == body_depth + 1:
+                    if elem.tag == W + 'p':
+                        yield _run_text(elem)
+                    elif elem.tag == W + 'tbl':
+                        yield from _table_rows(elem)
+                    # Everything before this point is done: drop it.
+                    body.clear()
+                depth -= 1
+
+
+# --- Plain text / markdown ---
+def _upload_bytes(uploaded_file):
+    """
+    The upload's bytes without another copy where possible: a read-only
+    mmap of a temporary file on disk. In-memory uploads are read(), which
+    hands back BytesIO's own buffer rather than a copy.
+    """
+    file = getattr(uploaded_file, 'file', uploaded_file)  # Django UploadedFile wraps the real file
+    try:
+        fileno = file.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return uploaded_file.read()
+    if os.fstat(fileno).st_size == 0:
+        return b''
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
+def _too_large(uploaded_file, max_chars):
+    return ExtractionLimitError(
+        f"{uploaded_file.name} is too large to process "
+        f"(more than {max_chars:,} characters of text)."
+    )
+
+
+def decode_text_upload(uploaded_file, max_chars=MAX_EXTRACT_CHARS):
+    """
+    Decodes a UTF-8 upload in one step, straight from its buffer, so the
+    raw bytes are not copied first. Oversized uploads are refused by their
+    size before anything is decoded.
+    """
+    size = getattr(uploaded_file, 'size', None)
+    if max_chars and size is not None and size > max_chars:
+        raise _too_large(uploaded_file, max_chars)
+    data = _upload_bytes(uploaded_file)
+    try:
+        if max_chars and len(data) > max_chars:
+            raise _too_large(uploaded_file, max_chars)
+        return str(data, 'utf-8')
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def extract_text(uploaded_file, max_chars=MAX_EXTRACT_CHARS):
+    """
+    Returns the text of an uploaded .docx or UTF-8 text file without
+    building a python-docx Document or holding the raw bytes and the
+    decoded text side by side.
+    """
+    if not uploaded_file.name.lower().endswith('.docx'):
+        return decode_text_upload(uploaded_file, max_chars)
+
+    out = []
+    size = 0
+    for piece in iter_docx_text(uploaded_file):
+        size += len(piece) + 1
+        if max_chars and size > max_chars:
+            raise _too_large(uploaded_file, max_chars)
+        out.append(piece)
+    return '\n'.join(out)
@@ -1,24 +1,17 @@
-def stream_strategy_generator(sample_drs, sample_strat, target_drs):
-    # 1. Setup Bedrock (SSL Verify False for Corporate Proxy)
-    bedrock_client = boto3.client(
-        service_name="bedrock-runtime",
-        region_name="us-east-1",
-        verify=False 
-    )
+import json
+import re
 
-    chat = ChatBedrock(
-        client=bedrock_client,
-        model_id="anthropic.claude-3-sonnet-20240229-v1:0",
-        model_kwargs={"temperature": 0.1, "max_tokens": 4096}
-    )
+import boto3
+from django.urls import reverse
+from langchain_aws import ChatBedrock
+from langchain_core.messages import HumanMessage
+from .artifact_store import StrategyArtifacts
 
-    # --- HTML Header ---
-    # We add 'html-docx.js' and 'FileSaver.js' to handle the DOCX conversion in the browser
-    yield """
+
+# --- Static page parts ---
+PAGE_HEADER = """
     <html>
     <head>
-        <script src="https://unpkg.com/html-docx-js/dist/html-docx.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/FileSaver.js/2.0.5/FileSaver.min.js"></script>
         <style>
             body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; max-width: 800px; margin: 2rem auto; padding: 0 1rem; color: #333; }
             .status-update { background: #e3f2fd; padding: 12px; border-left: 5px solid #2196f3; margin: 10px 0; border-radius: 2px; }
@@ -30,7 +23,7 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
             .content { white-space: pre-wrap; line-height: 1.6; }
             
             #download-area { margin-top: 30px; padding: 20px; background: #f0f0f0; text-align: center; border-radius: 8px; display: none; }
-            #download-btn { background: #6200ea; color: white; padding: 12px 25px; border: none; font-size: 16px; border-radius: 5px; cursor: pointer; transition: background 0.3s; }
+            #download-btn { display: inline-block; background: #6200ea; color: white; padding: 12px 25px; border: none; font-size: 16px; border-radius: 5px; cursor: pointer; transition: background 0.3s; text-decoration: none; }
             #download-btn:hover { background: #3700b3; }
         </style>
     </head>
@@ -40,6 +33,38 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
         <div id="stream-container">
     """
 
+PAGE_FOOTER = """
+        </div> <div id="download-area">
+            <a id="download-btn">Download Generated Strategy (.docx)</a>
+        </div>
+
+        <script>
+            // Auto-scroll to bottom
+            window.scrollTo(0, document.body.scrollHeight);
+        </script>
+    </body>
+    </html>
+    """
+
+
+def stream_strategy_generator(sample_drs, sample_strat, target_drs):
+    # 1. Setup Bedrock (SSL Verify False for Corporate Proxy)
+    bedrock_client = boto3.client(
+        service_name="bedrock-runtime",
+        region_name="us-east-1",
+        verify=False 
+    )
+
+    chat = ChatBedrock(
+        client=bedrock_client,
+        model_id="anthropic.claude-3-sonnet-20240229-v1:0",
+        model_kwargs={"temperature": 0.1, "max_tokens": 4096}
+    )
+
+    # --- HTML Header ---
+    # The DOCX is built on the server (StrategyArtifacts), so no browser-side converter is loaded
+    yield PAGE_HEADER
+
     # 2. Step A: Generate the Outline
     yield '<div class="status-update">Phase 1: Analyzing samples and creating Outline...</div>'
 
@@ -73,11 +98,8 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
         return
 
     # 3. Step B: Loop through Sections
-    # We maintain a list for the "Hidden" HTML that will become the DOCX
-    full_html_document = []
-
-    # Add a title for the DOCX
-    full_html_document.append("<h1 style='text-align:center; color:#2E74B5;'>Test Strategy Document</h1><br>")
+    # The DOCX is assembled on the server as each section completes
+    artifacts = StrategyArtifacts(("docx",), basename="Generated_Test_Strategy", docx_title="Test Strategy Document")
 
     for section in sections:
         yield f'<div class="status-update">Generating Section: <strong>{section}</strong>...</div>'
@@ -97,59 +119,18 @@ def stream_strategy_generator(sample_drs, sample_strat, target_drs):
         # -- A. View Output (Screen) --
         yield f'<div class="section-block"><h3>{section}</h3><div class="content">{content}</div></div>'
 
-        # -- B. Docx Output (Hidden) --
-        # We replace newlines with <br> tags so they render in Word correctly
-        # We wrap the content in <p> or <div> blocks
-        formatted_content = content.replace('\n', '<br>')
-        
-        full_html_document.append(f"""
-            <h2 style='color:#2E74B5; border-bottom:1px solid #ccc;'>{section}</h2>
-            <div style='font-family:Calibri, sans-serif; font-size:11pt;'>
-                {formatted_content}
-            </div>
-            <br>
-        """)
-
-    # 4. Final Hidden Block & Download Script
-    final_html_str = "".join(full_html_document)
-    
-    # We output the final HTML into a hidden div
-    yield f'<div id="final-docx-content" style="display:none;">{final_html_str}</div>'
-    
+        # -- B. Docx Output (server-side) --
+        artifacts.add_section(section, content)
+
+    # 4. Download Link (the DOCX is served from the artifact store)
+    tokens = artifacts.finish()
+    docx_url = reverse('download_artifact', args=[tokens['docx']])
+
     # Show the download button
-    yield '<script>document.getElementById("download-area").style.display = "block";</script>'
+    yield (
+        f'<script>document.getElementById("download-btn").href = "{docx_url}";'
+        'document.getElementById("download-area").style.display = "block";</script>'
+    )
     yield '<div class="status-success">Generation Complete! You can now download the file.</div>'
 
-    yield """
-        </div> <div id="download-area">
-            <button id="download-btn" onclick="generateDocx()">Download Generated Strategy (.docx)</button>
-        </div>
-
-        <script>
-            function generateDocx() {
-                // 1. Get the HTML content
-                var content = document.getElementById('final-docx-content').innerHTML;
-
-                // 2. Wrap it in a standard HTML document structure with Word-specific namespaces
-                var header = "<html xmlns:o='urn:schemas-microsoft-com:office:office' " +
-                             "xmlns:w='urn:schemas-microsoft-com:office:word' " +
-                             "xmlns='http://www.w3.org/TR/REC-html40'>" +
-                             "<head><meta charset='utf-8'><title>Test Strategy</title></head><body>";
-                var footer = "</body></html>";
-                
-                var sourceHTML = header + content + footer;
-
-                // 3. Use html-docx-js to convert the HTML string into a Blob
-                // Note: 'html-docx-js' (window.htmlDocx) must be loaded via the script tag
-                var converted = htmlDocx.asBlob(sourceHTML);
-
-                // 4. Use FileSaver to save the Blob to the user's computer
-                saveAs(converted, 'Generated_Test_Strategy.docx');
-            }
-            
-            // Auto-scroll to bottom
-            window.scrollTo(0, document.body.scrollHeight);
-        </script>
-    </body>
-    </html>
-    """
+    yield PAGE_FOOTER